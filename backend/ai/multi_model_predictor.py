@@ -38,6 +38,16 @@ class MultiModelPredictor:
         if len(self.price_history) > 1000:
             self.price_history = self.price_history[-500:]
     
+    def add_prices(self, prices: List[float], volume: float = 1.0):
+        """Add a batch of prices with a single history trim"""
+        start = len(self.price_history)
+        self.price_history.extend(
+            {'price': price, 'volume': volume, 'timestamp': start + i}
+            for i, price in enumerate(prices)
+        )
+        if len(self.price_history) > 1000:
+            self.price_history = self.price_history[-500:]
+    
     def extract_features(self, lookback: int = 30) -> Optional[np.ndarray]:
         """Extract comprehensive features for ML models"""
         if len(self.price_history) < lookback:
@@ -125,11 +135,13 @@ class MultiModelPredictor:
     
     def calculate_ema(self, prices, period):
         """Calculate Exponential Moving Average"""
+        # Closed form of the recursive EMA seeded with the first price: one dot product instead of a Python loop
+        prices = np.asarray(prices, dtype=np.float64)
         alpha = 2 / (period + 1)
-        ema = prices[0]
-        for price in prices[1:]:
-            ema = alpha * price + (1 - alpha) * ema
-        return ema
+        decay = (1 - alpha) ** np.arange(len(prices) - 1, -1, -1)
+        weights = alpha * decay
+        weights[0] = decay[0]
+        return float(weights @ prices)
     
     def calculate_rsi(self, prices, period=14):
         """Calculate Relative Strength Index"""
@@ -8,57 +8,69 @@ from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+PRICE_DECIMALS = 2  # Deriv volatility index quotes (R_100) have two decimals
+
+def last_digits(prices: np.ndarray) -> np.ndarray:
+    """Last quoted digit of each price, without formatting prices as strings"""
+    return np.mod(np.round(prices * 10 ** PRICE_DECIMALS).astype(np.int64), 10)
+
+def price_features(prices: np.ndarray) -> np.ndarray:
+    """Technical features for a window of at least 11 prices, oldest first"""
+    returns = np.diff(prices) / prices[:-1]
+    sma_5 = prices[-5:].mean()
+    sma_10 = prices[-10:].mean()
+    volatility = returns[-10:].std()
+    
+    # Price position relative to moving averages
+    current_price = prices[-1]
+    price_vs_sma5 = (current_price - sma_5) / sma_5
+    price_vs_sma10 = (current_price - sma_10) / sma_10
+    
+    # Momentum indicators
+    momentum_5 = (prices[-1] - prices[-6]) / prices[-6]
+    momentum_10 = (prices[-1] - prices[-11]) / prices[-11]
+    
+    # Last digit patterns
+    digits = last_digits(prices[-10:])
+    
+    return np.array([
+        price_vs_sma5, price_vs_sma10, volatility, momentum_5, momentum_10,
+        digits.mean(), digits.std(), len(returns)
+    ])
+
 class EnhancedAIPredictor:
+    HISTORY_SIZE = 1000
+
     def __init__(self):
-        self.price_history = []
+        # Ring buffer of recent prices; a new tick overwrites the oldest
+        self._prices = np.zeros(self.HISTORY_SIZE, dtype=np.float64)
+        self._head = 0
+        self._count = 0
         self.model = RandomForestClassifier(n_estimators=100, random_state=42)
         self.scaler = StandardScaler()
         self.is_trained = False
         self.model_path = "ai_model.pkl"
         
     def add_price(self, price: float, volume: float = 1.0):
-        """Add price data with volume"""
-        self.price_history.append({'price': price, 'volume': volume, 'timestamp': len(self.price_history)})
-        if len(self.price_history) > 1000:
-            self.price_history.pop(0)
+        """Add price data (volume is accepted for API compatibility but not used by any feature)"""
+        self._prices[self._head % self.HISTORY_SIZE] = price
+        self._head += 1
+        self._count = min(self._count + 1, self.HISTORY_SIZE)
+    
+    def recent_prices(self, count: int) -> np.ndarray:
+        """Last `count` prices, oldest first"""
+        count = min(count, self._count)
+        return self._prices[(self._head - count + np.arange(count)) % self.HISTORY_SIZE]
     
     def extract_features(self, lookback: int = 20) -> Optional[np.ndarray]:
         """Extract technical features from price history"""
-        if len(self.price_history) < lookback:
+        if self._count < max(lookback, 11):
             return None
-            
-        prices = np.array([p['price'] for p in self.price_history[-lookback:]])
-        
-        # Technical indicators
-        returns = np.diff(prices) / prices[:-1]
-        sma_5 = np.mean(prices[-5:])
-        sma_10 = np.mean(prices[-10:])
-        volatility = np.std(returns[-10:]) if len(returns) >= 10 else 0
-        
-        # Price position relative to moving averages
-        current_price = prices[-1]
-        price_vs_sma5 = (current_price - sma_5) / sma_5
-        price_vs_sma10 = (current_price - sma_10) / sma_10
-        
-        # Momentum indicators
-        momentum_5 = (prices[-1] - prices[-6]) / prices[-6] if len(prices) >= 6 else 0
-        momentum_10 = (prices[-1] - prices[-11]) / prices[-11] if len(prices) >= 11 else 0
-        
-        # Last digit patterns
-        last_digits = [int(str(p).split('.')[-1][-1]) for p in prices[-10:] if '.' in str(p)]
-        digit_mean = np.mean(last_digits) if last_digits else 5
-        digit_std = np.std(last_digits) if len(last_digits) > 1 else 0
-        
-        features = np.array([
-            price_vs_sma5, price_vs_sma10, volatility, momentum_5, momentum_10,
-            digit_mean, digit_std, len(returns)
-        ])
-        
-        return features.reshape(1, -1)
+        return price_features(self.recent_prices(lookback)).reshape(1, -1)
     
     def predict_next_digit(self) -> Dict:
         """Enhanced prediction with ML model"""
-        if len(self.price_history) < 20:
+        if self._count < 20:
             return {'prediction': 5, 'confidence': 0.5, 'signal': 'neutral'}
         
         try:
@@ -77,7 +89,7 @@ class EnhancedAIPredictor:
                 return self._fallback_prediction()
             
             # Determine signal
-            recent_prices = [p['price'] for p in self.price_history[-5:]]
+            recent_prices = self.recent_prices(5)
             trend = (recent_prices[-1] - recent_prices[0]) / recent_prices[0]
             signal = 'buy' if trend > 0.001 else 'sell' if trend < -0.001 else 'neutral'
             
@@ -95,16 +107,16 @@ class EnhancedAIPredictor:
     
     def _fallback_prediction(self) -> Dict:
         """Fallback pattern-based prediction"""
-        recent_prices = np.array([p['price'] for p in self.price_history[-20:]])
+        recent_prices = self.recent_prices(20)
         price_changes = np.diff(recent_prices)
         
         trend = float(np.mean(price_changes))
         volatility = np.std(price_changes)
         
         # Last digit analysis
-        last_digits = [int(str(p).split('.')[-1][-1]) for p in recent_prices if '.' in str(p)]
-        if last_digits:
-            digit_freq = np.bincount(last_digits, minlength=10)
+        digits = last_digits(recent_prices)
+        if digits.size:
+            digit_freq = np.bincount(digits, minlength=10)
             least_common = np.argmin(digit_freq)
             confidence = min(0.8, 0.5 + abs(trend) * 100 + volatility * 10)
             
@@ -136,7 +148,7 @@ class EnhancedAIPredictor:
                     X.append(features)
                     # Target: next digit
                     next_price = historical_data[i]['price']
-                    next_digit = int(str(next_price).split('.')[-1][-1]) if '.' in str(next_price) else 5
+                    next_digit = int(last_digits(np.array([next_price]))[0])
                     y.append(next_digit)
             
             if len(X) < 50:
@@ -166,26 +178,7 @@ class EnhancedAIPredictor:
         """Extract features from a list of prices"""
         if len(prices) < 20:
             return None
-            
-        prices = np.array(prices)
-        returns = np.diff(prices) / prices[:-1]
-        
-        sma_5 = np.mean(prices[-5:])
-        sma_10 = np.mean(prices[-10:])
-        volatility = np.std(returns[-10:])
-        
-        current_price = prices[-1]
-        price_vs_sma5 = (current_price - sma_5) / sma_5
-        price_vs_sma10 = (current_price - sma_10) / sma_10
-        
-        momentum_5 = (prices[-1] - prices[-6]) / prices[-6] if len(prices) >= 6 else 0
-        momentum_10 = (prices[-1] - prices[-11]) / prices[-11] if len(prices) >= 11 else 0
-        
-        last_digits = [int(str(p).split('.')[-1][-1]) for p in prices[-10:] if '.' in str(p)]
-        digit_mean = np.mean(last_digits) if last_digits else 5
-        digit_std = np.std(last_digits) if len(last_digits) > 1 else 0
-        
-        return np.array([price_vs_sma5, price_vs_sma10, volatility, momentum_5, momentum_10, digit_mean, digit_std, len(returns)])
+        return price_features(np.asarray(prices, dtype=np.float64))
     
     def load_model(self):
         """Load pre-trained model"""
@@ -2,11 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from datetime import datetime
 import asyncio
+import threading
 
 from models.database import get_db, User, Trade
 from ai.auto_trading_controller import AutoTradingController
 from ai.loss_prevention_ai import LossPreventionAI
 from ai.market_sentiment_analyzer import MarketSentimentAnalyzer
+from ai.predictor import EnhancedAIPredictor
 from strategies.auto_trader import AutoTrader
 from utils.auth import get_current_user
 from utils.logger import setup_logger
@@ -19,6 +21,15 @@ trading_controller = AutoTradingController()
 loss_prevention_ai = LossPreventionAI()
 market_analyzer = MarketSentimentAnalyzer()
 auto_trader = AutoTrader()
+enhanced_predictor = EnhancedAIPredictor()
+
+# MarketSentimentAnalyzer appends to its price history on every call, so
+# calls made from worker threads must not interleave.
+_sentiment_lock = threading.Lock()
+
+def _analyze_sentiment(current_price: float) -> dict:
+    with _sentiment_lock:
+        return market_analyzer.analyze_market_sentiment(current_price)
 
 @router.get("/market-safety")
 async def get_market_safety_analysis(current_user: dict = Depends(get_current_user)):
@@ -51,7 +62,7 @@ async def get_market_sentiment(current_user: dict = Depends(get_current_user)):
         # Get current price (simplified)
         current_price = 100.0  # Would get from real market data
         
-        sentiment_analysis = market_analyzer.analyze_market_sentiment(current_price)
+        sentiment_analysis = _analyze_sentiment(current_price)
         trading_signals = market_analyzer.get_trading_signals()
         
         return {
@@ -278,18 +289,15 @@ async def get_auto_trading_status(current_user: dict = Depends(get_current_user)
 async def get_enhanced_ai_prediction(current_user: dict = Depends(get_current_user)):
     """Get AI prediction with enhanced analysis"""
     try:
-        from ai.predictor import EnhancedAIPredictor
-        ai_predictor = EnhancedAIPredictor()
-        
-        # Get basic prediction
-        prediction = ai_predictor.predict_next_digit()
-        
-        # Get market safety analysis
         market_data = {'price': 100.0, 'volume': 1.0}  # Would get real data
-        safety_analysis = loss_prevention_ai.analyze_market_safety(market_data)
-        
-        # Get market sentiment
-        sentiment_analysis = market_analyzer.analyze_market_sentiment(100.0)
+
+        # Basic prediction, market safety and market sentiment are independent,
+        # so run them concurrently in worker threads
+        prediction, safety_analysis, sentiment_analysis = await asyncio.gather(
+            asyncio.to_thread(enhanced_predictor.predict_next_digit),
+            asyncio.to_thread(loss_prevention_ai.analyze_market_safety, market_data),
+            asyncio.to_thread(_analyze_sentiment, 100.0)
+        )
         
         # Enhanced prediction with safety checks
         enhanced_prediction = {
@@ -306,6 +314,4 @@ async def get_enhanced_ai_prediction(current_user: dict = Depends(get_current_us
     
     except Exception as e:
         logger.error(f"Enhanced AI prediction failed: {e}")
-        from ai.predictor import EnhancedAIPredictor
-        ai_predictor = EnhancedAIPredictor()
-        return ai_predictor.predict_next_digit()  # Fallback to basic prediction
\ No newline at end of file
+        return enhanced_predictor.predict_next_digit()  # Fallback to basic prediction
\ No newline at end of file
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, EmailStr
 from datetime import datetime, timedelta
+import hashlib
 import jwt
 
 from models.database import get_db, User
@@ -21,12 +22,10 @@ class UserRegister(BaseModel):
 
 def verify_password(plain_password, hashed_password):
     # Use SHA256 for demo purposes since bcrypt is having issues
-    import hashlib
     return hashlib.sha256(plain_password.encode()).hexdigest() == hashed_password
 
 def get_password_hash(password):
     # Use SHA256 for demo purposes since bcrypt is having issues
-    import hashlib
     return hashlib.sha256(password.encode()).hexdigest()
 
 @router.post("/login")
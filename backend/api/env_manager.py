@@ -1,9 +1,15 @@
 import os
+from functools import lru_cache
 from dotenv import set_key, find_dotenv
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+@lru_cache(maxsize=1)
+def env_snapshot():
+    """Return (DERIV_API_TOKEN, is_demo) from the environment, cached until the env is updated"""
+    return os.getenv('DERIV_API_TOKEN'), os.getenv('TRADING_MODE', 'demo') == 'demo'
+
 def update_env_file(updates: dict):
     """
     Safely update key-value pairs in the .env file.
@@ -14,5 +20,7 @@ def update_env_file(updates: dict):
             env_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
         for key, value in updates.items():
             set_key(env_path, key, value)
+            os.environ[key] = value
+        env_snapshot.cache_clear()
     except Exception as e:
-        logger.error(f"Failed to update .env file: {e}")
\ No newline at end of file
+        logger.error(f"Failed to update .env file: {e}")
@@ -1,37 +1,156 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import bindparam, case, func, insert, select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Dict, List, Optional, Tuple
+import functools
 import json
+import orjson
 import os
+import time
 import asyncio
+import math
 from datetime import datetime, timedelta
 
-from models.database import get_db, User, Trade, Strategy
-from services.deriv_trader import DerivTrader
-from services.risk_manager import RiskManager
+from api.env_manager import env_snapshot, update_env_file
+from api.trading_mode import set_trading_mode
+from models.database import get_db, SessionLocal, User, Trade, Strategy, Tick
+from services.deriv_pool import deriv_pool
 from ai.predictor import EnhancedAIPredictor
-from ai.auto_trading_controller import AutoTradingController
-from ai.loss_prevention_ai import LossPreventionAI
-from ai.market_sentiment_analyzer import MarketSentimentAnalyzer
-from strategies.auto_trader import AutoTrader
 from utils.auth import get_current_user
 from utils.config import Config
 from utils.logger import setup_logger
 logger = setup_logger(__name__)
 router = APIRouter()
 
-# Initialize services
-deriv_trader = DerivTrader()
-risk_manager = RiskManager()
-ai_predictor = EnhancedAIPredictor()
-trading_controller = AutoTradingController()
-loss_prevention_ai = LossPreventionAI()
-market_analyzer = MarketSentimentAnalyzer()
-auto_trader = AutoTrader()
+# Created on first use so workers that never serve /ai/prediction do not load the model
+@functools.cache
+def _ai_predictor() -> EnhancedAIPredictor:
+    return EnhancedAIPredictor()
+
+# Statements built once at import so SQLAlchemy's compiled cache is hit per request
+_USER_BY_ID = select(User).where(User.id == bindparam("uid"))
+_ACTIVE_TRADES = select(
+    Trade.id, Trade.timestamp, Trade.stake, Trade.contract_type, Trade.result, Trade.is_demo
+).where(
+    Trade.user_id == bindparam("uid"),
+    Trade.result.in_(['pending', 'win', 'lose'])
+).order_by(Trade.timestamp.desc()).limit(10)
+_HISTORY_TICKS = select(Tick.id, Tick.timestamp, Tick.price, Tick.last_digit).order_by(Tick.timestamp.desc()).limit(100)
+_HISTORY_TRADES = select(
+    Trade.id, Trade.timestamp, Trade.stake, Trade.prediction, Trade.result, Trade.pnl
+).where(Trade.user_id == bindparam("uid")).order_by(Trade.timestamp.desc()).limit(50)
+_recent_pnls = select(func.coalesce(Trade.pnl, 0).label("pnl")).where(
+    Trade.user_id == bindparam("uid")
+).order_by(Trade.timestamp.desc()).limit(100).subquery()
+# SQLite has no STDDEV, so the variance is derived from AVG(pnl) and AVG(pnl * pnl)
+_ANALYTICS_SUMMARY = select(
+    func.count(),
+    func.count(case((_recent_pnls.c.pnl > 0, 1))),
+    func.count(case((_recent_pnls.c.pnl < 0, 1))),
+    func.coalesce(func.sum(case((_recent_pnls.c.pnl > 0, _recent_pnls.c.pnl))), 0),
+    func.coalesce(func.sum(case((_recent_pnls.c.pnl < 0, _recent_pnls.c.pnl))), 0),
+    func.sum(_recent_pnls.c.pnl),
+    func.avg(_recent_pnls.c.pnl),
+    func.avg(_recent_pnls.c.pnl * _recent_pnls.c.pnl)
+).select_from(_recent_pnls)
+
+# Balance polls within the TTL reuse the last answer; failed authorizations are cached briefly
+_BALANCE_TTL = 5.0
+_BALANCE_ERROR_TTL = 2.0
+# Keys are client-supplied tokens, so the cache is pruned on write and capped
+_BALANCE_CACHE_SIZE = 1024
+_balance_cache: Dict[Tuple[str, str], Tuple[Optional[float], bool, float]] = {}
+_balance_inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+# Advanced analytics per user_id, dropped when that user places a trade through /trade
+_ANALYTICS_TTL = 30.0
+_analytics_cache: Dict[int, Tuple[dict, float]] = {}
+
+# Fixed payloads are encoded once; these branches are mostly hit by misconfigured clients
+_TOKEN_PROMPT_BYTES = orjson.dumps({
+    "success": False,
+    "error": "API token required",
+    "message": "Please provide your Deriv API token to fetch balance. Use POST /api/balance with api_token in request body.",
+    "balance": 0.0,
+    "requires_token": True
+})
+_TOKEN_REQUIRED_BYTES = {
+    account_type: orjson.dumps({
+        "success": False,
+        "error": "API token required",
+        "message": "Please provide your Deriv API token to fetch balance",
+        "balance": 0.0,
+        "account_type": account_type
+    })
+    for account_type in ('demo', 'live')
+}
+
+_TOKEN_PROMPT_RESPONSE = Response(content=_TOKEN_PROMPT_BYTES, media_type="application/json")
+
+def _load_user(db: Session, user_id: int):
+    return db.execute(_USER_BY_ID, {"uid": user_id}).scalars().first()
+
+def _record_trade(db: Session, stmt) -> int:
+    trade_id = db.execute(stmt.returning(Trade.id)).scalar_one()
+    db.commit()
+    return trade_id
+
+def _invalidate_trade_caches(user_id: int, api_token: Optional[str]):
+    """A new trade moves both the account balance and the user's analytics"""
+    _analytics_cache.pop(user_id, None)
+    for key in [key for key in _balance_cache if key[0] == api_token]:
+        _balance_cache.pop(key, None)
+
+async def _fetch_balance(api_token: str, app_id: str):
+    """Return (balance, is_virtual) for a token using one pooled connection"""
+    async with deriv_pool.acquire(api_token, app_id) as trader:
+        if not trader.authorized:
+            return None, False
+        balance = await trader.get_balance()
+        return balance, bool(trader.authorize_response.get('is_virtual'))
+
+def _store_balance(key: Tuple[str, str], balance: Optional[float], is_virtual: bool):
+    """Cache a balance, dropping expired entries and, past the size cap, the oldest ones"""
+    now = time.monotonic()
+    for stale in [k for k, (_, _, fetched_at) in _balance_cache.items() if now - fetched_at >= _BALANCE_TTL]:
+        del _balance_cache[stale]
+    _balance_cache.pop(key, None)
+    while len(_balance_cache) >= _BALANCE_CACHE_SIZE:
+        del _balance_cache[next(iter(_balance_cache))]
+    _balance_cache[key] = (balance, is_virtual, now)
+
+async def _refresh_balance(api_token: str, app_id: str):
+    balance, is_virtual = await _fetch_balance(api_token, app_id)
+    _store_balance((api_token, app_id), float(balance) if balance is not None else None, is_virtual)
+    return balance, is_virtual
+
+def _forget_inflight(key: Tuple[str, str], task: asyncio.Task):
+    if _balance_inflight.get(key) is task:
+        del _balance_inflight[key]
+    # Retrieve the outcome so a fetch whose callers all timed out does not log as unhandled
+    if not task.cancelled():
+        task.exception()
+
+async def _cached_balance(api_token: str, app_id: str):
+    """Like _fetch_balance, but concurrent pollers for the same token share one Deriv request"""
+    key = (api_token, app_id)
+    cached = _balance_cache.get(key)
+    if cached:
+        balance, is_virtual, fetched_at = cached
+        ttl = _BALANCE_TTL if balance is not None else _BALANCE_ERROR_TTL
+        if time.monotonic() - fetched_at < ttl:
+            return balance, is_virtual
+
+    task = _balance_inflight.get(key)
+    if task is None:
+        task = _balance_inflight[key] = asyncio.create_task(_refresh_balance(api_token, app_id))
+        task.add_done_callback(lambda t: _forget_inflight(key, t))
+    # Shielded so one caller timing out does not cancel the fetch the others are waiting on
+    return await asyncio.shield(task)
 
 @router.get("/user")
-async def get_user(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == current_user['user_id']).first()
+def get_user(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+    user = _load_user(db, current_user['user_id'])
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return {
@@ -46,10 +165,7 @@ async def get_user(current_user: dict = Depends(get_current_user), db: Session =
 
 @router.post("/balance")
 async def get_balance(balance_request: dict, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    import asyncio
-    import os
-
-    user = db.query(User).filter(User.id == current_user['user_id']).first()
+    user = await asyncio.to_thread(_load_user, db, current_user['user_id'])
     
     # Extract token and app_id from request
     api_token = balance_request.get('api_token', '').strip()
@@ -60,6 +176,8 @@ async def get_balance(balance_request: dict, current_user: dict = Depends(get_cu
 
     # If no token provided, return error asking for token
     if not api_token:
+        if account_type in _TOKEN_REQUIRED_BYTES:
+            return Response(content=_TOKEN_REQUIRED_BYTES[account_type], media_type="application/json")
         return {
             "success": False,
             "error": "API token required",
@@ -68,38 +186,29 @@ async def get_balance(balance_request: dict, current_user: dict = Depends(get_cu
             "account_type": account_type
         }
 
-    # Always try to fetch from Deriv API with provided token
-    temp_trader = DerivTrader()
+    # Always try to fetch from Deriv API with provided token, reusing a pooled connection
     try:
-        # Connect with the provided token
-        connected = await asyncio.wait_for(
-            temp_trader.connect(api_token=api_token, app_id=app_id, is_demo=False),
-            timeout=15
-        )
-        
-        if connected and temp_trader.authorized:
-            balance = await asyncio.wait_for(temp_trader.get_balance(), timeout=10)
-            if balance is not None:
-                await temp_trader.close()
-                logger.info(f"Balance fetched successfully: {balance}")
-                
-                # Update user's stored token and balance if successful
-                if user:
-                    user.api_token = api_token
-                    user.app_id = app_id
-                    user.balance = balance
-                    # Determine account type based on response
-                    user.account_type = 'demo' if 'VRT' in str(temp_trader.ws) or account_type == 'demo' else 'live'
-                    db.commit()
-                
-                return {
-                    "success": True,
-                    "balance": float(balance),
-                    "account_type": user.account_type if user else account_type,
-                    "message": "Balance retrieved successfully"
-                }
-        
-        await temp_trader.close()
+        balance, is_virtual = await asyncio.wait_for(_cached_balance(api_token, app_id), timeout=15)
+
+        if balance is not None:
+            logger.info(f"Balance fetched successfully: {balance}")
+
+            # Update user's stored token and balance if successful
+            if user:
+                user.api_token = api_token
+                user.app_id = app_id
+                user.balance = balance
+                # Determine account type based on response
+                user.account_type = 'demo' if is_virtual or account_type == 'demo' else 'live'
+                await asyncio.to_thread(db.commit)
+
+            return {
+                "success": True,
+                "balance": float(balance),
+                "account_type": user.account_type if user else account_type,
+                "message": "Balance retrieved successfully"
+            }
+
         return {
             "success": False,
             "error": "Authorization failed",
@@ -109,7 +218,6 @@ async def get_balance(balance_request: dict, current_user: dict = Depends(get_cu
         }
         
     except asyncio.TimeoutError:
-        await temp_trader.close()
         return {
             "success": False,
             "error": "Connection timeout",
@@ -118,7 +226,6 @@ async def get_balance(balance_request: dict, current_user: dict = Depends(get_cu
             "account_type": account_type
         }
     except Exception as e:
-        await temp_trader.close()
         logger.error(f"Balance fetch failed: {e}")
         return {
             "success": False,
@@ -129,65 +236,60 @@ async def get_balance(balance_request: dict, current_user: dict = Depends(get_cu
         }
 
 @router.get("/balance")
-async def get_balance_prompt(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_balance_prompt(current_user: dict = Depends(get_current_user)):
     """GET endpoint that always prompts for API token"""
-    return {
-        "success": False,
-        "error": "API token required",
-        "message": "Please provide your Deriv API token to fetch balance. Use POST /api/balance with api_token in request body.",
-        "balance": 0.0,
-        "requires_token": True
-    }
+    return _TOKEN_PROMPT_RESPONSE
 
 @router.post("/trade")
 async def place_trade(trade_request: dict, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    import os
-    api_token = os.getenv('DERIV_API_TOKEN')
-    trading_mode = os.getenv('TRADING_MODE', 'demo')
-    is_demo = trading_mode == 'demo'
+    api_token, is_demo = env_snapshot()
     actual_stake = trade_request['amount']
 
     # For demo mode, don't use API token
     effective_api_token = None if is_demo else api_token
 
     try:
-        connected = await deriv_trader.connect(effective_api_token, is_demo=is_demo)
-        if connected:
-            trade_result = await deriv_trader.buy_contract({
-                "contract_type": trade_request["contract_type"],
-                "symbol": trade_request["symbol"],
-                "amount": actual_stake,
-                "duration": trade_request["duration"],
-                "duration_unit": trade_request["duration_unit"],
-                "barrier": trade_request.get("barrier"),
-                "currency": "USD"
-            })
-
-            await deriv_trader.close()
+        # The pool closes (or keeps) the socket on every path, including exceptions
+        async with deriv_pool.acquire(effective_api_token, is_demo=is_demo) as trader:
+            connected = trader.is_connected
+            if connected:
+                trade_result = await trader.buy_contract({
+                    "contract_type": trade_request["contract_type"],
+                    "symbol": trade_request["symbol"],
+                    "amount": actual_stake,
+                    "duration": trade_request["duration"],
+                    "duration_unit": trade_request["duration_unit"],
+                    "barrier": trade_request.get("barrier"),
+                    "currency": "USD"
+                })
 
+        if connected:
             if "error" in trade_result:
                 raise HTTPException(status_code=400, detail=trade_result["error"]["message"])
 
             contract_id = trade_result.get("buy", {}).get("contract_id", "unknown")
 
-            # Record trade
-            trade = Trade(
-                user_id=current_user['user_id'],
-                stake=actual_stake,
-                prediction=trade_request.get('prediction', 0),
-                result='pending',
-                pnl=0,
-                contract_id=contract_id,
-                contract_type=trade_request["contract_type"],
-                is_demo=is_demo,
-                confidence=trade_request.get('confidence', 0.5)
+            # Record trade in a single INSERT ... RETURNING; stamped in Python like every other row, since
+            # SQLite's CURRENT_TIMESTAMP has whole seconds and would sort below same-second rows
+            trade_id = await asyncio.to_thread(
+                _record_trade, db, insert(Trade).values(
+                    user_id=current_user['user_id'],
+                    timestamp=datetime.utcnow(),
+                    stake=actual_stake,
+                    prediction=trade_request.get('prediction', 0),
+                    result='pending',
+                    pnl=0,
+                    contract_id=contract_id,
+                    contract_type=trade_request["contract_type"],
+                    is_demo=is_demo,
+                    confidence=trade_request.get('confidence', 0.5)
+                )
             )
-
-            db.add(trade)
-            db.commit()
+            _invalidate_trade_caches(current_user['user_id'], effective_api_token)
 
             return {
                 "success": True,
+                "trade_id": trade_id,
                 "contract_id": contract_id,
                 "result": "pending",
                 "pnl": 0,
@@ -199,33 +301,23 @@ async def place_trade(trade_request: dict, current_user: dict = Depends(get_curr
 
 @router.get("/ai/prediction")
 async def get_ai_prediction():
-    prediction = ai_predictor.predict_next_digit()
+    prediction = _ai_predictor().predict_next_digit()
     return prediction
 
 @router.options("/trades/active")
 async def options_active_trades():
     return {}
 
-@router.get("/trades/active")
-async def get_active_trades(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+@router.get("/trades/active", response_class=ORJSONResponse)
+def get_active_trades(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
     try:
-        trades = db.query(Trade).filter(
-            Trade.user_id == current_user['user_id'],
-            Trade.result.in_(['pending', 'win', 'lose'])
-        ).order_by(Trade.timestamp.desc()).limit(10).all()
+        trades = db.execute(_ACTIVE_TRADES, {"uid": current_user['user_id']}).all()
         
-        return {
+        return ORJSONResponse({
             "success": True,
-            "trades": [{
-                "id": t.id,
-                "timestamp": t.timestamp.isoformat(),
-                "stake": t.stake,
-                "contract_type": t.contract_type,
-                "result": t.result,
-                "is_demo": t.is_demo
-            } for t in trades],
+            "trades": [t._asdict() for t in trades],
             "count": len(trades)
-        }
+        })
     except Exception as e:
         logger.error(f"Error in get_active_trades: {e}")
         return {
@@ -234,35 +326,39 @@ async def get_active_trades(current_user: dict = Depends(get_current_user), db:
             "count": 0
         }
 
-@router.get("/history")
-async def get_history(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    from models.database import Tick
-    
-    ticks = db.query(Tick).order_by(Tick.timestamp.desc()).limit(100).all()
-    trades = db.query(Trade).filter(
-        Trade.user_id == current_user['user_id']
-    ).order_by(Trade.timestamp.desc()).limit(50).all()
+@router.get("/history", response_class=ORJSONResponse)
+def get_history(request: Request, current_user: dict = Depends(get_current_user)):
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        return StreamingResponse(_history_lines(current_user['user_id']), media_type="application/x-ndjson")
+
+    # No get_db dependency: the streaming branch reads through its own session and would leave it idle
+    db = SessionLocal()
+    try:
+        ticks = db.execute(_HISTORY_TICKS).all()
+        trades = db.execute(_HISTORY_TRADES, {"uid": current_user['user_id']}).all()
+    finally:
+        db.close()
     
-    return {
-        "ticks": [{
-            "id": t.id,
-            "timestamp": t.timestamp.isoformat(),
-            "price": t.price,
-            "last_digit": t.last_digit
-        } for t in ticks],
-        "trades": [{
-            "id": t.id,
-            "timestamp": t.timestamp.isoformat(),
-            "stake": t.stake,
-            "prediction": t.prediction,
-            "result": t.result,
-            "pnl": t.pnl
-        } for t in trades]
-    }
+    # Rows are keyed by the projected column names, so _asdict() yields the response records as-is
+    return ORJSONResponse({
+        "ticks": [t._asdict() for t in ticks],
+        "trades": [t._asdict() for t in trades]
+    })
+
+def _history_lines(user_id: int):
+    """Yield /history as NDJSON, one record per line tagged with its type"""
+    # The generator outlives the request dependencies, so it owns its session
+    db = SessionLocal()
+    try:
+        for kind, stmt, params in (("tick", _HISTORY_TICKS, {}), ("trade", _HISTORY_TRADES, {"uid": user_id})):
+            for row in db.execute(stmt.execution_options(yield_per=200), params):
+                yield orjson.dumps({"type": kind, **row._asdict()}, option=orjson.OPT_APPEND_NEWLINE)
+    finally:
+        db.close()
 
 @router.post("/account/api-token")
 async def update_api_token(token_data: dict, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == current_user['user_id']).first()
+    user = await asyncio.to_thread(_load_user, db, current_user['user_id'])
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -271,51 +367,40 @@ async def update_api_token(token_data: dict, current_user: dict = Depends(get_cu
 
     if api_token:
         # Test the API token
-        temp_trader = DerivTrader()
         try:
             effective_app_id = app_id or "1089"  # Default fallback
             logger.info(f"Testing API token with app_id: {effective_app_id}")
-            connected = await asyncio.wait_for(
-                temp_trader.connect(api_token=api_token, app_id=effective_app_id, is_demo=False),
-                timeout=15
-            )
-            if connected and temp_trader.authorized:
-                # Get live balance to verify token works
-                balance = await asyncio.wait_for(temp_trader.get_balance(), timeout=10)
-                await temp_trader.close()
-
-                if balance is not None:
-                    user.api_token = api_token
-                    user.app_id = app_id if app_id else user.app_id
-                    user.account_type = 'live'
-                    user.balance = balance
-                    db.commit()
-
-                    # Update .env file for persistence
-                    from api.env_manager import update_env_file
-                    updates = {
-                        'DERIV_API_TOKEN': api_token,
-                        'TRADING_MODE': 'live'
-                    }
-                    if app_id:
-                        updates['DERIV_APP_ID'] = app_id
-                    update_env_file(updates)
-
-                    return {
-                        "success": True,
-                        "message": "API token updated successfully",
-                        "balance": balance,
-                        "account_type": "live"
-                    }
-
-            await temp_trader.close()
+            # Get live balance to verify token works
+            balance, _ = await asyncio.wait_for(_fetch_balance(api_token, effective_app_id), timeout=15)
+
+            if balance is not None:
+                user.api_token = api_token
+                user.app_id = app_id if app_id else user.app_id
+                user.account_type = 'live'
+                user.balance = balance
+                await asyncio.to_thread(db.commit)
+
+                # Update .env file for persistence
+                updates = {
+                    'DERIV_API_TOKEN': api_token,
+                    'TRADING_MODE': 'live'
+                }
+                if app_id:
+                    updates['DERIV_APP_ID'] = app_id
+                update_env_file(updates)
+
+                return {
+                    "success": True,
+                    "message": "API token updated successfully",
+                    "balance": balance,
+                    "account_type": "live"
+                }
+
             raise HTTPException(status_code=400, detail="Invalid API token. Please check your token and try again.")
 
         except asyncio.TimeoutError:
-            await temp_trader.close()
             raise HTTPException(status_code=408, detail="Connection to Deriv timed out. Please try again.")
         except Exception as e:
-            await temp_trader.close()
             logger.error(f"API token validation failed: {e}")
             raise HTTPException(status_code=400, detail=f"Failed to validate API token: {str(e)}")
     else:
@@ -324,10 +409,9 @@ async def update_api_token(token_data: dict, current_user: dict = Depends(get_cu
         user.app_id = None
         user.account_type = 'demo'
         user.balance = 10000.0
-        db.commit()
+        await asyncio.to_thread(db.commit)
 
         # Update .env file for persistence
-        from api.env_manager import update_env_file
         update_env_file({
             'DERIV_API_TOKEN': '',
             'TRADING_MODE': 'demo'
@@ -342,7 +426,7 @@ async def update_api_token(token_data: dict, current_user: dict = Depends(get_cu
 
 @router.post("/account/toggle")
 async def toggle_account_type(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == current_user['user_id']).first()
+    user = await asyncio.to_thread(_load_user, db, current_user['user_id'])
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -352,46 +436,38 @@ async def toggle_account_type(current_user: dict = Depends(get_current_user), db
             raise HTTPException(status_code=400, detail="API token required to switch to live account")
 
         # Test the API token
-        temp_trader = DerivTrader()
         try:
             effective_app_id = user.app_id or "1089"
-            connected = await temp_trader.connect(api_token=user.api_token, app_id=effective_app_id, is_demo=False)
-            if connected and temp_trader.authorized:
-                balance = await temp_trader.get_balance()
-                await temp_trader.close()
-
-                if balance is not None:
-                    user.account_type = 'live'
-                    user.balance = balance
-                    db.commit()
-
-                    # Update .env file for persistence
-                    from utils.env_manager import update_env_file
-                    update_env_file({
-                        'TRADING_MODE': 'live'
-                    })
-
-                    return {
-                        "account_type": "live",
-                        "balance": balance,
-                        "message": "Switched to live account"
-                    }
-
-            await temp_trader.close()
+            balance, _ = await asyncio.wait_for(_fetch_balance(user.api_token, effective_app_id), timeout=15)
+
+            if balance is not None:
+                user.account_type = 'live'
+                user.balance = balance
+                await asyncio.to_thread(db.commit)
+
+                # Update .env file for persistence
+                update_env_file({
+                    'TRADING_MODE': 'live'
+                })
+
+                return {
+                    "account_type": "live",
+                    "balance": balance,
+                    "message": "Switched to live account"
+                }
+
             raise HTTPException(status_code=400, detail="Failed to connect with API token")
 
         except Exception as e:
-            await temp_trader.close()
             logger.error(f"Live account switch failed: {e}")
             raise HTTPException(status_code=400, detail="Failed to switch to live account")
     else:
         # Switch to demo
         user.account_type = 'demo'
         user.balance = 10000.0
-        db.commit()
+        await asyncio.to_thread(db.commit)
 
         # Update .env file for persistence
-        from utils.env_manager import update_env_file
         update_env_file({
             'TRADING_MODE': 'demo'
         })
@@ -404,13 +480,11 @@ async def toggle_account_type(current_user: dict = Depends(get_current_user), db
 
 @router.post("/trading-mode")
 async def toggle_trading_mode(mode_data: dict, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    from api.trading_mode import set_trading_mode
-
     new_mode = mode_data.get('mode', 'demo')
     if new_mode not in ['demo', 'live']:
         raise HTTPException(status_code=400, detail="Mode must be 'demo' or 'live'")
 
-    user = db.query(User).filter(User.id == current_user['user_id']).first()
+    user = await asyncio.to_thread(_load_user, db, current_user['user_id'])
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -420,27 +494,22 @@ async def toggle_trading_mode(mode_data: dict, current_user: dict = Depends(get_
             raise HTTPException(status_code=400, detail="API token required for live mode. Please set up your API token first.")
 
         # Test connection before switching
-        temp_trader = DerivTrader()
         try:
             app_id = user.app_id or '1089'
-            connected = await asyncio.wait_for(
-                temp_trader.connect(api_token=user.api_token, app_id=app_id, is_demo=False),
-                timeout=15
-            )
-            if not (connected and temp_trader.authorized):
-                raise HTTPException(status_code=400, detail="Failed to authorize with your API token.")
+            async with deriv_pool.acquire(user.api_token, app_id) as trader:
+                authorized = trader.authorized
         except asyncio.TimeoutError:
             raise HTTPException(status_code=408, detail="Connection to Deriv timed out.")
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Connection error: {str(e)}")
-        finally:
-            await temp_trader.close()
+        if not authorized:
+            raise HTTPException(status_code=400, detail="Failed to authorize with your API token.")
 
     # Update user's trading mode
     user.account_type = new_mode
     if new_mode == 'demo':
         user.balance = 10000.0  # Reset demo balance
-    db.commit()
+    await asyncio.to_thread(db.commit)
 
     # Update global trading mode
     if set_trading_mode(new_mode):
@@ -450,38 +519,45 @@ async def toggle_trading_mode(mode_data: dict, current_user: dict = Depends(get_
         raise HTTPException(status_code=500, detail="Failed to set trading mode in environment.")
 
 @router.get("/trading-mode")
-async def get_trading_mode_status(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == current_user['user_id']).first()
+def get_trading_mode_status(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+    user = _load_user(db, current_user['user_id'])
     if user:
         return {"trading_mode": user.account_type or 'demo'}
     return {"trading_mode": 'demo'}
 
-@router.get("/analytics/advanced")
-async def get_advanced_analytics(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
-    trades = db.query(Trade).filter(
-        Trade.user_id == current_user['user_id']
-    ).order_by(Trade.timestamp.desc()).limit(100).all()
+@router.get("/analytics/advanced", response_class=ORJSONResponse)
+def get_advanced_analytics(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+    user_id = current_user['user_id']
+    cached = _analytics_cache.get(user_id)
+    if cached and time.monotonic() - cached[1] < _ANALYTICS_TTL:
+        return ORJSONResponse(cached[0])
+
+    analytics = _compute_analytics(db, user_id)
+    _analytics_cache[user_id] = (analytics, time.monotonic())
+    return ORJSONResponse(analytics)
+
+def _compute_analytics(db: Session, user_id: int) -> dict:
+    total, win_count, loss_count, win_sum, loss_sum, total_pnl, mean, mean_sq = db.execute(
+        _ANALYTICS_SUMMARY, {"uid": user_id}
+    ).one()
     
-    if not trades:
+    if not total:
         return {"total_trades": 0, "win_rate": 0, "profit_factor": 0, "max_drawdown": 0}
     
-    pnls = [t.pnl or 0 for t in trades]
-    wins = [p for p in pnls if p > 0]
-    losses = [p for p in pnls if p < 0]
-    
-    win_rate = len(wins) / len(pnls) * 100 if pnls else 0
-    profit_factor = sum(wins) / abs(sum(losses)) if losses else float('inf')
+    win_rate = win_count / total * 100
+    profit_factor = win_sum / abs(loss_sum) if loss_count else float('inf')
     
-    # Calculate Sharpe ratio (simplified)
-    returns = pnls
-    sharpe_ratio = (sum(returns) / len(returns)) / (sum([(r - sum(returns)/len(returns))**2 for r in returns]) / len(returns))**0.5 if len(returns) > 1 else 0
+    # Calculate Sharpe ratio (simplified); tiny variances are rounding noise from E[x^2] - E[x]^2
+    variance = mean_sq - mean * mean
+    std = math.sqrt(variance) if variance > 1e-12 * max(mean_sq, 1.0) else 0
+    sharpe_ratio = mean / std if total > 1 and std > 0 else 0
     
     return {
-        "total_trades": len(trades),
+        "total_trades": total,
         "win_rate": round(win_rate, 2),
         "profit_factor": round(profit_factor, 2),
         "sharpe_ratio": round(sharpe_ratio, 2),
-        "total_pnl": round(sum(pnls), 2),
-        "avg_win": round(sum(wins) / len(wins), 2) if wins else 0,
-        "avg_loss": round(sum(losses) / len(losses), 2) if losses else 0
+        "total_pnl": round(total_pnl, 2),
+        "avg_win": round(win_sum / win_count, 2) if win_count else 0,
+        "avg_loss": round(loss_sum / loss_count, 2) if loss_count else 0
     }
\ No newline at end of file
@@ -1,21 +1,24 @@
 import os
-from dotenv import load_dotenv, set_key
+from dotenv import set_key
+from api.env_manager import env_snapshot
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+_TRADING_MODES = frozenset(('demo', 'live'))
+
 def get_trading_mode():
     """Get current trading mode with validation"""
-    load_dotenv()  # Load environment variables from .env file
-    mode = os.getenv('TRADING_MODE', 'demo')
-    if mode not in ['demo', 'live']:
+    # .env is loaded once at import by utils.config; os.environ is kept current by the setters
+    mode = os.environ.get('TRADING_MODE', 'demo')
+    if mode not in _TRADING_MODES:
         logger.warning(f"Invalid trading mode '{mode}', defaulting to demo")
         return 'demo'
     return mode
 
 def set_trading_mode(mode):
     """Set trading mode with validation and error handling"""
-    if mode not in ['demo', 'live']:
+    if mode not in _TRADING_MODES:
         logger.error(f"Invalid trading mode: {mode}")
         raise ValueError("Trading mode must be 'demo' or 'live'")
     
@@ -24,8 +27,9 @@ def set_trading_mode(mode):
         if os.path.exists(env_path):
             set_key(env_path, 'TRADING_MODE', mode)
         os.environ['TRADING_MODE'] = mode
+        env_snapshot.cache_clear()
         logger.info(f"Trading mode set to: {mode}")
         return True
     except Exception as e:
         logger.error(f"Failed to set trading mode: {e}")
-        return False
\ No newline at end of file
+        return False
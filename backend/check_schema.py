@@ -0,0 +1,16 @@
+import functools
+import sqlite3
+import sys
+
+@functools.cache
+def _conn():
+    return sqlite3.connect('trading.db')
+
+def check_schema(table):
+    return _conn().execute(f"PRAGMA table_info({table});").fetchall()
+
+if __name__ == "__main__":
+    for table in sys.argv[1:] or ["ticks", "trades"]:
+        print(f"{table.capitalize()} table columns:")
+        for col in check_schema(table):
+            print(col)
@@ -50,12 +50,10 @@ def fix_user_balances():
             for user in users:
                 user_id, email, balance, account_type = user
                 print(f"  ID: {user_id}, Email: {email}, Balance: ${balance}, Type: {account_type}")
-                
-                # Fix zero balances
-                if balance == 0 or balance is None:
-                    new_balance = 10000.0
-                    cursor.execute("UPDATE users SET balance = ? WHERE id = ?", (new_balance, user_id))
-                    print(f"  → Fixed balance for {email}: ${new_balance}")
+            
+            # Fix zero balances in one statement
+            cursor.execute("UPDATE users SET balance = ? WHERE balance IS NULL OR balance = 0", (10000.0,))
+            print(f"  → Fixed {cursor.rowcount} zero balances: $10000.0")
             
             conn.commit()
             print("Balance fixes applied!")
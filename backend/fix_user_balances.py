@@ -3,33 +3,25 @@
 Fix user balances - ensure all users have proper balance values
 """
 
+from sqlalchemy import case
 from models.database import SessionLocal, User
 
 def fix_user_balances():
     db = SessionLocal()
     try:
-        # Find users with null balances
-        users_with_null_balance = db.query(User).filter(User.balance.is_(None)).all()
+        # Set default balance based on account type for users with null balances
+        null_fixed = db.query(User).filter(User.balance.is_(None)).update(
+            {User.balance: case((User.account_type == 'demo', 10000.0), else_=0.0)},
+            synchronize_session=False
+        )
+        print(f"Fixed {null_fixed} users with null balance")
         
-        print(f"Found {len(users_with_null_balance)} users with null balance")
-        
-        for user in users_with_null_balance:
-            # Set default balance based on account type
-            default_balance = 10000.0 if user.account_type == 'demo' else 0.0
-            user.balance = default_balance
-            print(f"Fixed balance for user {user.email}: {default_balance}")
-        
-        # Also check for users with 0 balance in demo accounts
-        demo_users_zero_balance = db.query(User).filter(
+        # Also reset demo accounts with 0 balance
+        zero_fixed = db.query(User).filter(
             User.account_type == 'demo',
             User.balance == 0.0
-        ).all()
-        
-        print(f"Found {len(demo_users_zero_balance)} demo users with 0 balance")
-        
-        for user in demo_users_zero_balance:
-            user.balance = 10000.0
-            print(f"Reset demo balance for user {user.email}: 10000.0")
+        ).update({User.balance: 10000.0}, synchronize_session=False)
+        print(f"Reset {zero_fixed} demo users with 0 balance to 10000.0")
         
         db.commit()
         print("All user balances fixed successfully!")
@@ -1,11 +1,55 @@
 import MetaTrader5 as mt5
 import asyncio
+import functools
 import logging
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# The MT5 terminal API blocks and is not thread-safe, so every call goes through one worker thread
+_mt5_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mt5")
+
+# MT5 symbol -> Deriv symbol
+_SYMBOL_MAP = {
+    "EURUSD": "frxEURUSD",
+    "GBPUSD": "frxGBPUSD",
+    "USDJPY": "frxUSDJPY",
+    "AUDUSD": "frxAUDUSD",
+    "USDCAD": "frxUSDCAD"
+}
+
+class Position(NamedTuple):
+    """An open MT5 position; converted to a dict only at the HTTP/WebSocket boundary"""
+    ticket: int
+    symbol: str
+    type: str
+    volume: float
+    price_open: float
+    profit: float
+    time: datetime
+
+    def as_dict(self) -> Dict:
+        return self._asdict()
+
+def _position_from_mt5(pos) -> Position:
+    """Convert a terminal TradePosition tuple into a Position"""
+    return Position(
+        pos.ticket,
+        pos.symbol,
+        "buy" if pos.type == 0 else "sell",
+        pos.volume,
+        pos.price_open,
+        pos.profit,
+        datetime.fromtimestamp(pos.time)
+    )
+
+async def _mt5_call(func, *args, **kwargs):
+    """Run a blocking MetaTrader5 call without stalling the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_mt5_executor, functools.partial(func, *args, **kwargs))
+
 class MT5Integration:
     def __init__(self):
         self.connected = False
@@ -14,16 +58,16 @@ class MT5Integration:
     async def connect(self, login: int, password: str, server: str):
         """Connect to MT5 terminal"""
         try:
-            if not mt5.initialize():
+            if not await _mt5_call(mt5.initialize):
                 logger.error("MT5 initialization failed")
                 return False
                 
-            if not mt5.login(login, password=password, server=server):
-                logger.error(f"MT5 login failed: {mt5.last_error()}")
+            if not await _mt5_call(mt5.login, login, password=password, server=server):
+                logger.error(f"MT5 login failed: {await _mt5_call(mt5.last_error)}")
                 return False
                 
             self.connected = True
-            self.account_info = mt5.account_info()
+            self.account_info = await _mt5_call(mt5.account_info)
             logger.info(f"Connected to MT5: {self.account_info.name}")
             return True
             
@@ -31,71 +75,62 @@ class MT5Integration:
             logger.error(f"MT5 connection error: {e}")
             return False
     
-    async def get_positions(self) -> List[Dict]:
-        """Get open positions from MT5"""
+    async def _raw_positions(self):
+        """Open positions as the terminal's TradePosition tuples"""
         if not self.connected:
-            return []
-            
-        positions = mt5.positions_get()
-        return [
-            {
-                "ticket": pos.ticket,
-                "symbol": pos.symbol,
-                "type": "buy" if pos.type == 0 else "sell",
-                "volume": pos.volume,
-                "price_open": pos.price_open,
-                "profit": pos.profit,
-                "time": datetime.fromtimestamp(pos.time)
-            }
-            for pos in positions or []
-        ]
+            return ()
+        return await _mt5_call(mt5.positions_get) or ()
+    
+    async def positions(self) -> List[Position]:
+        """Get open positions from MT5"""
+        return [_position_from_mt5(pos) for pos in await self._raw_positions()]
+    
+    async def get_positions(self) -> List[Dict]:
+        """Get open positions from MT5 as plain dicts"""
+        return [pos.as_dict() for pos in await self.positions()]
     
     async def get_signals(self) -> List[Dict]:
         """Monitor MT5 for new signals/trades"""
-        positions = await self.get_positions()
-        
-        # Convert MT5 positions to Deriv signals
-        signals = []
-        for pos in positions:
-            signal = {
-                "symbol": self._convert_symbol(pos["symbol"]),
-                "action": pos["type"],
-                "price": pos["price_open"],
-                "volume": pos["volume"],
+        # Convert MT5 positions straight to Deriv signals, without the intermediate position dicts
+        return [
+            {
+                "symbol": self._convert_symbol(pos.symbol),
+                "action": pos.type,
+                "price": pos.price_open,
+                "volume": pos.volume,
                 "source": "MT5",
-                "timestamp": pos["time"].isoformat()
+                "timestamp": pos.time.isoformat()
             }
-            signals.append(signal)
-            
-        return signals
+            for pos in await self.positions()
+        ]
     
     def _convert_symbol(self, mt5_symbol: str) -> str:
         """Convert MT5 symbol to Deriv symbol"""
-        symbol_map = {
-            "EURUSD": "frxEURUSD",
-            "GBPUSD": "frxGBPUSD", 
-            "USDJPY": "frxUSDJPY",
-            "AUDUSD": "frxAUDUSD",
-            "USDCAD": "frxUSDCAD"
-        }
-        return symbol_map.get(mt5_symbol, mt5_symbol)
+        return _SYMBOL_MAP.get(mt5_symbol, mt5_symbol)
     
-    async def monitor_trades(self, callback):
+    async def monitor_trades(self, callback, full_refresh_interval: float = 10):
         """Monitor MT5 for new trades and execute callback"""
-        last_positions = set()
+        known_positions: Dict[int, Position] = {}
+        last_total = None
+        last_refresh = 0.0
+        loop = asyncio.get_running_loop()
         
         while self.connected:
             try:
-                current_positions = await self.get_positions()
-                current_tickets = {pos["ticket"] for pos in current_positions}
-                
-                # Check for new positions
-                new_tickets = current_tickets - last_positions
-                for ticket in new_tickets:
-                    pos = next(p for p in current_positions if p["ticket"] == ticket)
-                    await callback(pos)
-                
-                last_positions = current_tickets
+                # positions_total() is a cheap scalar; only pull and convert every position when it
+                # moves, plus a periodic refresh in case one opened and one closed in the same second
+                total = await _mt5_call(mt5.positions_total)
+                now = loop.time()
+                if total != last_total or now - last_refresh >= full_refresh_interval:
+                    last_total, last_refresh = total, now
+                    current_positions = {pos.ticket: pos for pos in await self.positions()}
+                    
+                    # Check for new positions
+                    for ticket, pos in current_positions.items():
+                        if ticket not in known_positions:
+                            await callback(pos)
+                    
+                    known_positions = current_positions
                 await asyncio.sleep(1)  # Check every second
                 
             except Exception as e:
@@ -105,7 +140,7 @@ class MT5Integration:
     def disconnect(self):
         """Disconnect from MT5"""
         if self.connected:
-            mt5.shutdown()
+            _mt5_executor.submit(mt5.shutdown).result()
             self.connected = False
             logger.info("Disconnected from MT5")
 
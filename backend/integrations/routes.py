@@ -44,11 +44,11 @@ async def start_mt5_monitoring(background_tasks: BackgroundTasks):
     """Start monitoring MT5 for new trades"""
     async def process_mt5_signal(position):
         signal = {
-            "symbol": position["symbol"],
-            "action": position["type"],
-            "price": position["price_open"],
-            "volume": position["volume"],
-            "timestamp": position["time"].isoformat()
+            "symbol": position.symbol,
+            "action": position.type,
+            "price": position.price_open,
+            "volume": position.volume,
+            "timestamp": position.time.isoformat()
         }
         await signal_processor.process_signal(signal, "MT5")
     
@@ -1,14 +1,37 @@
 import asyncio
 import logging
+from collections import Counter
 from typing import Dict, Any
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# proposal_open_contract statuses of a contract that has finished
+_SETTLED_STATUSES = frozenset(("won", "lost", "sold"))
+
+_ACTION_MAP = {
+    "buy": "CALL", "call": "CALL", "up": "CALL",
+    "sell": "PUT", "put": "PUT", "down": "PUT",
+}
+
 class SignalProcessor:
+    BASE_CAPITAL = 100.0
+    KELLY_FRACTION = 0.25  # Fractional Kelly to damp drawdowns
+    MIN_STAKE = 0.35  # Deriv's minimum stake
+    MAX_STAKE = 10.0
+    PNL_EMA_ALPHA = 0.05
+
     def __init__(self):
         self.active_signals = {}
         self.risk_manager = None
+        # Running tallies so the risk check doesn't rescan active_signals: executions today,
+        # and open (unsettled) signals per symbol
+        self._today = datetime.now().date()
+        self._today_count = 0
+        self._symbol_count = Counter()
+        # Exponential moving averages of winning and losing P&L, for the Kelly payoff ratio
+        self._avg_win = 0.0
+        self._avg_loss = 0.0
         
     async def process_signal(self, signal: Dict[str, Any], source: str) -> Dict:
         """Process signals from TradingView or MT5"""
@@ -23,6 +46,8 @@ class SignalProcessor:
             
             # Convert to Deriv trade parameters
             trade_params = await self._convert_to_deriv_params(signal, source)
+            if trade_params["amount"] <= 0:
+                return {"status": "rejected", "message": "No positive edge for this signal"}
             
             # Execute trade
             from ..trading.engine import execute_trade
@@ -44,22 +69,24 @@ class SignalProcessor:
     
     async def _check_risk_limits(self, signal: Dict) -> bool:
         """Check if signal passes risk management rules"""
-        # Check daily trade limit
-        today_trades = len([s for s in self.active_signals.values() 
-                           if s.get("date") == datetime.now().date()])
+        self._roll_day()
         
-        if today_trades >= 50:  # Max 50 trades per day
+        # Check daily trade limit
+        if self._today_count >= 50:  # Max 50 trades per day
             return False
             
         # Check symbol exposure
-        symbol_exposure = len([s for s in self.active_signals.values() 
-                              if s.get("symbol") == signal["symbol"]])
-        
-        if symbol_exposure >= 3:  # Max 3 trades per symbol
+        if self._symbol_count[signal["symbol"]] >= 3:  # Max 3 open trades per symbol
             return False
             
         return True
     
+    def _roll_day(self, today=None):
+        today = today or datetime.now().date()
+        if today != self._today:
+            self._today = today
+            self._today_count = 0
+    
     async def _convert_to_deriv_params(self, signal: Dict, source: str) -> Dict:
         """Convert external signal to Deriv trade parameters"""
         
@@ -84,34 +111,55 @@ class SignalProcessor:
     
     def _get_contract_type(self, signal: Dict) -> str:
         """Determine Deriv contract type from signal"""
-        action = signal.get("action", "").lower()
-        
-        if action in ["buy", "call", "up"]:
-            return "CALL"
-        elif action in ["sell", "put", "down"]:
-            return "PUT"
-        else:
-            return "CALL"  # Default
+        return _ACTION_MAP.get(signal.get("action", "").lower(), "CALL")  # Default CALL
     
     async def _calculate_stake(self, signal: Dict) -> float:
-        """Calculate optimal stake using risk management"""
-        base_stake = 1.0
-        
-        # Apply Kelly Criterion if available
+        """Size the stake with fractional Kelly: k = p - (1 - p) / R; 0 means there is no edge to bet on"""
         confidence = signal.get("confidence", 0.6)
         win_rate = signal.get("win_rate", 0.55)
         
-        if confidence > 0.7 and win_rate > 0.6:
-            base_stake *= 1.5  # Increase stake for high confidence
-        elif confidence < 0.5:
-            base_stake *= 0.5  # Reduce stake for low confidence
-            
-        return min(base_stake, 10.0)  # Max stake limit
+        # Payoff ratio from observed results; even money until both sides have been seen
+        payoff = self._avg_win / self._avg_loss if self._avg_win and self._avg_loss else 1.0
+        kelly = win_rate - (1 - win_rate) / payoff
+        if kelly <= 0:
+            return 0.0
+        
+        stake = kelly * self.KELLY_FRACTION * confidence * self.BASE_CAPITAL
+        return round(min(max(stake, self.MIN_STAKE), self.MAX_STAKE), 2)
+    
+    def _record_pnl(self, pnl: float):
+        alpha = self.PNL_EMA_ALPHA
+        if pnl > 0:
+            self._avg_win = pnl if not self._avg_win else self._avg_win + alpha * (pnl - self._avg_win)
+        elif pnl < 0:
+            loss = -pnl
+            self._avg_loss = loss if not self._avg_loss else self._avg_loss + alpha * (loss - self._avg_loss)
+    
+    async def settle_open_signals(self, trader) -> int:
+        """Ask Deriv about open signal contracts and settle the finished ones; returns how many settled"""
+        settled = 0
+        for contract_id in list(self.active_signals):
+            contract = await trader.get_contract_info(contract_id)
+            if trader.awaiting_reply:
+                # The request timed out; further replies on this socket can't be trusted
+                break
+            if contract and contract.get("status") in _SETTLED_STATUSES:
+                self.settle_signal(contract_id, float(contract.get("profit", 0)))
+                settled += 1
+        return settled
+    
+    def settle_signal(self, contract_id, pnl: float):
+        """Record the P&L of a settled signal contract; unknown contract ids are ignored"""
+        settled = self.active_signals.pop(contract_id, None)
+        if settled is not None:
+            self._symbol_count[settled["symbol"]] -= 1
+            self._record_pnl(pnl)
     
     def _log_signal_execution(self, signal: Dict, source: str, result: Dict):
         """Log signal execution for analysis"""
+        now = datetime.now()
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "source": source,
             "signal": signal,
             "result": result,
@@ -125,9 +173,12 @@ class SignalProcessor:
             self.active_signals[result["contract_id"]] = {
                 "source": source,
                 "signal": signal,
-                "date": datetime.now().date(),
+                "date": now.date(),
                 "symbol": signal["symbol"]
             }
+            self._roll_day(now.date())
+            self._today_count += 1
+            self._symbol_count[signal["symbol"]] += 1
 
 # Global signal processor
 signal_processor = SignalProcessor()
\ No newline at end of file
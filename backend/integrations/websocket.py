@@ -1,37 +1,73 @@
 from fastapi import WebSocket, WebSocketDisconnect
 import asyncio
-import json
+import orjson
 import logging
-from typing import List
-from .mt5 import mt5_client
+from typing import Dict, List, Optional, Set
+from .mt5 import Position, mt5_client
 from .signal_processor import signal_processor
 
 logger = logging.getLogger(__name__)
 
 class IntegrationWebSocketManager:
+    SEND_TIMEOUT = 2.0
+    OUTBOX_SIZE = 64
+
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.is_broadcasting = False
+        # Keyed by id(): Starlette WebSockets are Mappings and therefore unhashable
+        self.active_connections: Dict[int, WebSocket] = {}
+        self._broadcaster_task: Optional[asyncio.Task] = None
+        # Last snapshot sent; None forces the next poll to broadcast
+        self._last_positions: Optional[List[Position]] = None
+        self._outboxes: Dict[int, asyncio.Queue] = {}
+        self._relays: Dict[int, asyncio.Task] = {}
+        self._closers: Set[asyncio.Task] = set()
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections[id(websocket)] = websocket
+        outbox = self._outboxes[id(websocket)] = asyncio.Queue(maxsize=self.OUTBOX_SIZE)
+        self._relays[id(websocket)] = asyncio.create_task(self._relay(websocket, outbox))
         logger.info(f"Integration WebSocket connected. Total: {len(self.active_connections)}")
         
-        if not self.is_broadcasting:
-            asyncio.create_task(self.start_broadcasting())
+        # A new client has no snapshot yet
+        self._last_positions = None
+        if self._broadcaster_task is None or self._broadcaster_task.done():
+            self._broadcaster_task = asyncio.create_task(self.start_broadcasting())
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        self.active_connections.pop(id(websocket), None)
+        self._outboxes.pop(id(websocket), None)
+        relay = self._relays.pop(id(websocket), None)
+        if relay is not None and relay is not asyncio.current_task():
+            relay.cancel()
         logger.info(f"Integration WebSocket disconnected. Total: {len(self.active_connections)}")
+        
+        # From inside the broadcaster the task is left alone; its loop exits once no clients remain
+        if (not self.active_connections and self._broadcaster_task is not None
+                and self._broadcaster_task is not asyncio.current_task()):
+            self._broadcaster_task.cancel()
+            self._broadcaster_task = None
+
+    def _drop(self, websocket: WebSocket, reason: str):
+        """Disconnect a client the server gave up on, and close its socket so it knows to reconnect"""
+        self.disconnect(websocket)
+        task = asyncio.create_task(self._close(websocket, reason))
+        self._closers.add(task)
+        task.add_done_callback(self._closers.discard)
+
+    async def _close(self, websocket: WebSocket, reason: str):
+        try:
+            # 1013 Try Again Later
+            await asyncio.wait_for(websocket.close(code=1013, reason=reason), timeout=self.SEND_TIMEOUT)
+        except Exception as e:
+            logger.debug(f"Closing dropped integration WebSocket failed: {e}")
 
     async def broadcast_mt5_data(self, data):
-        """Broadcast MT5 position data to all connected clients"""
+        """Broadcast a snapshot of MT5 positions to all connected clients as one frame"""
         if self.active_connections:
             message = {
-                "type": "mt5_position",
-                "data": data,
+                "type": "mt5_positions",
+                "data": data["positions"],
                 "timestamp": data.get("time")
             }
             await self._broadcast_message(message)
@@ -46,44 +82,67 @@ class IntegrationWebSocketManager:
             }
             await self._broadcast_message(message)
 
+    async def _relay(self, websocket: WebSocket, outbox: asyncio.Queue):
+        """Drain one client's outbox so a slow peer never blocks the broadcaster.
+
+        Messages go out as binary frames holding UTF-8 JSON; browsers decode them with
+        JSON.parse(new TextDecoder().decode(event.data)).
+        """
+        try:
+            while True:
+                payload = await outbox.get()
+                await asyncio.wait_for(websocket.send_bytes(payload), timeout=self.SEND_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error broadcasting to client: {e}")
+            self._drop(websocket, "send failed")
+
     async def _broadcast_message(self, message):
-        """Send message to all connected clients"""
+        """Queue message for all connected clients"""
         if not self.active_connections:
             return
-            
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(json.dumps(message))
-            except Exception as e:
-                logger.error(f"Error broadcasting to client: {e}")
-                disconnected.append(connection)
         
-        # Remove disconnected clients
-        for conn in disconnected:
-            self.disconnect(conn)
+        # Encoded once for every client; orjson also handles the datetimes in MT5 position data
+        payload = orjson.dumps(message)
+        for connection in list(self.active_connections.values()):
+            outbox = self._outboxes.get(id(connection))
+            if outbox is None:
+                continue
+            try:
+                outbox.put_nowait(payload)
+            except asyncio.QueueFull:
+                logger.warning("Integration WebSocket client is not keeping up, disconnecting")
+                self._drop(connection, "client too slow")
 
     async def start_broadcasting(self):
-        """Start broadcasting MT5 data if connected"""
-        self.is_broadcasting = True
+        """Broadcast MT5 data while clients are connected; stops once the last one disconnects"""
         logger.info("Started integration broadcasting")
         
-        while self.active_connections:
-            try:
-                if mt5_client.connected:
-                    # Get current MT5 positions
-                    positions = await mt5_client.get_positions()
-                    for position in positions:
-                        await self.broadcast_mt5_data(position)
-                
-                await asyncio.sleep(2)  # Broadcast every 2 seconds
-                
-            except Exception as e:
-                logger.error(f"Broadcasting error: {e}")
-                await asyncio.sleep(5)
-        
-        self.is_broadcasting = False
-        logger.info("Stopped integration broadcasting")
+        try:
+            while self.active_connections:
+                try:
+                    if mt5_client.connected:
+                        # MT5 has no change notifications, so poll and only send when the snapshot differs
+                        positions = await mt5_client.positions()
+                        if positions != self._last_positions and (positions or self._last_positions is not None):
+                            self._last_positions = positions
+                            await self.broadcast_mt5_data({
+                                "positions": [pos.as_dict() for pos in positions],
+                                "time": positions[0].time if positions else None
+                            })
+                    
+                    await asyncio.sleep(2)  # Poll every 2 seconds
+                    
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Broadcasting error: {e}")
+                    await asyncio.sleep(5)
+        finally:
+            if self._broadcaster_task is asyncio.current_task():
+                self._broadcaster_task = None
+            logger.info("Stopped integration broadcasting")
 
 # Global WebSocket manager
 integration_ws_manager = IntegrationWebSocketManager()
\ No newline at end of file
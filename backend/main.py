@@ -1,9 +1,11 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 import asyncio
 import json
 import sqlite3
+import threading
 from datetime import datetime, timedelta
 import os
 import websockets
@@ -16,7 +18,14 @@ from api import auth, routes
 
 load_dotenv()
 
-app = FastAPI()
+# libuv-based event loop where available (uvloop does not support Windows, where MT5 runs)
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Include auth routes
 app.include_router(auth.router, prefix="/api", tags=["auth"])
@@ -43,10 +52,30 @@ app.add_middleware(
 )
 
 # Database setup
+# One shared autocommit connection; WAL lets readers proceed while a write is in flight
+DB = sqlite3.connect('trading.db', check_same_thread=False, isolation_level=None, cached_statements=256)
+_db_lock = threading.Lock()
+
+# Kept as constants so every call hits the connection's prepared-statement cache
+_INSERT_TRADE_SQL = "INSERT INTO trades (user_id, timestamp, stake, contract_type, contract_id, is_demo) VALUES (?, ?, ?, ?, ?, ?)"
+_ACTIVE_TRADES_SQL = "SELECT * FROM trades WHERE user_id = 1 AND result IS NULL ORDER BY timestamp DESC LIMIT 10"
+_ANALYTICS_SQL = """SELECT COUNT(*),
+                  COUNT(CASE WHEN pnl > 0 THEN 1 END),
+                  COALESCE(SUM(CASE WHEN pnl > 0 THEN pnl END), 0),
+                  COALESCE(ABS(SUM(CASE WHEN pnl < 0 THEN pnl END)), 0)
+           FROM trades WHERE user_id = 1 AND pnl IS NOT NULL"""
+
+def _db_execute(sql: str, params: tuple = ()):
+    """Run one statement on the shared connection and return its rows (call via asyncio.to_thread)"""
+    with _db_lock:
+        return DB.execute(sql, params).fetchall()
+
 def init_db():
-    conn = sqlite3.connect('trading.db')
-    conn.execute('DROP TABLE IF EXISTS trades')
-    conn.execute('DROP TABLE IF EXISTS users')
+    conn = DB
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
     conn.execute('''
         CREATE TABLE IF NOT EXISTS users (
             id INTEGER PRIMARY KEY,
@@ -78,33 +107,53 @@ def init_db():
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     ''')
-    conn.commit()
-    conn.close()
+
+    # Tables are kept across restarts; PRAGMA user_version records which migrations have run
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < 1:
+        # Databases created before versioning may lack the columns this server writes
+        trades_columns = {row[1] for row in conn.execute("PRAGMA table_info(trades)")}
+        for column, decl in (("contract_id", "TEXT"), ("contract_type", "TEXT"), ("is_demo", "BOOLEAN DEFAULT 1")):
+            if column not in trades_columns:
+                conn.execute(f"ALTER TABLE trades ADD COLUMN {column} {decl}")
+        conn.execute("PRAGMA user_version = 1")
+
+    # Covers the analytics aggregate, which only reads user_id and pnl
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_trades_user_pnl ON trades (user_id, pnl)')
 
 init_db()
 
 # AI Prediction Engine
 class AIPredictor:
-    def __init__(self):
-        self.price_history = []
+    def __init__(self, size: int = 100, decimals: int = 2):
+        # Fixed ring buffer so a new tick overwrites the oldest instead of shifting the list
+        self._buf = np.zeros(size, dtype=np.float64)
+        self._head = 0
+        self._n = 0
+        self._scale = 10 ** decimals
         
     def add_price(self, price: float):
-        self.price_history.append(price)
-        if len(self.price_history) > 100:
-            self.price_history.pop(0)
+        self._buf[self._head % self._buf.size] = price
+        self._head += 1
+        self._n = min(self._n + 1, self._buf.size)
+    
+    def _recent(self, count: int) -> np.ndarray:
+        """Last `count` prices in arrival order"""
+        count = min(count, self._n)
+        return self._buf[(self._head - count + np.arange(count)) % self._buf.size]
     
     def predict_next_digit(self) -> dict:
-        if len(self.price_history) < 10:
+        if self._n < 10:
             return {'prediction': 5, 'confidence': 0.65, 'signal': 'neutral'}
         
-        recent_prices = np.array(self.price_history[-10:])
+        recent_prices = self._recent(10)
         price_changes = np.diff(recent_prices)
         
         trend = np.mean(price_changes)
         volatility = np.std(price_changes)
         
-        last_digits = [int(str(p).split('.')[-1][-1]) for p in self.price_history[-20:] if '.' in str(p)]
-        if last_digits:
+        last_digits = np.mod(np.round(self._recent(20) * self._scale).astype(np.int64), 10)
+        if last_digits.size:
             digit_freq = np.bincount(last_digits, minlength=10)
             least_common = np.argmin(digit_freq)
             
@@ -168,7 +217,7 @@ trader = DerivTrader()
 
 # Create default user
 def ensure_default_user():
-    conn = sqlite3.connect('trading.db')
+    conn = DB
     cursor = conn.execute("SELECT id FROM users WHERE id = 1")
     if not cursor.fetchone():
         # Use a simple hash for demo purposes
@@ -178,8 +227,6 @@ def ensure_default_user():
             "INSERT INTO users (id, email, hashed_password, full_name, account_type, balance) VALUES (1, 'demo@brightbot.com', ?, 'Demo User', 'demo', 1221.95)",
             (hashed_password,)
         )
-        conn.commit()
-    conn.close()
 
 ensure_default_user()
 
@@ -192,13 +239,11 @@ async def place_trade(trade: TradeRequest):
     result = await trader.buy_contract(trade)
     
     if "buy" in result:
-        conn = sqlite3.connect('trading.db')
-        conn.execute(
-            "INSERT INTO trades (user_id, timestamp, stake, contract_type, contract_id, is_demo) VALUES (?, ?, ?, ?, ?, ?)",
+        await asyncio.to_thread(
+            _db_execute,
+            _INSERT_TRADE_SQL,
             (1, datetime.now(), trade.amount, trade.contract_type, result.get("buy", {}).get("contract_id"), True)
         )
-        conn.commit()
-        conn.close()
     
     return result
 
@@ -211,33 +256,18 @@ async def get_ai_prediction():
 
 @app.get("/api/trades/active")
 async def get_active_trades():
-    conn = sqlite3.connect('trading.db')
-    cursor = conn.execute(
-        "SELECT * FROM trades WHERE user_id = 1 AND result IS NULL ORDER BY timestamp DESC LIMIT 10"
-    )
-    trades = cursor.fetchall()
-    conn.close()
+    trades = await asyncio.to_thread(_db_execute, _ACTIVE_TRADES_SQL)
     
     return {"trades": trades}
 
 @app.get("/api/analytics/advanced")
 async def get_analytics():
-    conn = sqlite3.connect('trading.db')
-    cursor = conn.execute(
-        "SELECT stake, pnl FROM trades WHERE user_id = 1 AND pnl IS NOT NULL"
-    )
-    trades = cursor.fetchall()
-    conn.close()
+    (total, wins, total_profit, total_loss), = await asyncio.to_thread(_db_execute, _ANALYTICS_SQL)
     
-    if not trades:
+    if not total:
         return {"win_rate": 0, "profit_factor": 0, "total_trades": 0}
     
-    wins = len([t for t in trades if t[1] > 0])
-    total = len(trades)
     win_rate = wins / total * 100
-    
-    total_profit = sum([t[1] for t in trades if t[1] > 0])
-    total_loss = abs(sum([t[1] for t in trades if t[1] < 0]))
     profit_factor = total_profit / total_loss if total_loss > 0 else 0
     
     return {
@@ -250,4 +280,4 @@ async def get_analytics():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    uvicorn.run(app, host="127.0.0.1", port=8000, ws_per_message_deflate=False)
@@ -1,43 +1,61 @@
 from fastapi import FastAPI, WebSocket, HTTPException, Depends
+from starlette.websockets import WebSocketState
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict
 import asyncio
 import json
 import numpy
+import orjson
 import websockets
 import os
+import struct
+import time
+from itertools import groupby
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from contextlib import contextmanager
+from sqlalchemy import bindparam, insert, select
 from sqlalchemy.orm import Session
 
-from models.database import create_tables, get_db, User, Tick, Trade, SessionLocal
+from models.database import create_tables, get_db, User, Tick, Trade, SessionLocal, engine
 from api.routes import router as api_router
+from api.trading_mode import get_trading_mode
 from api.ai_routes import router as ai_router
 from integrations.routes import router as integration_router
+from integrations.signal_processor import signal_processor
 from services.contract_monitor import ContractMonitor
 from services.notification_service import NotificationService
 from services.market_data import MarketDataService
 from strategies.auto_trader import AutoTrader
 from services.deriv_trader import DerivTrader
+from services.deriv_pool import deriv_pool
 from services.risk_manager import RiskManager
 from ai.predictor import EnhancedAIPredictor
 from ai.multi_model_predictor import MultiModelPredictor
 from utils.auth import hash_password, verify_password, create_jwt_token, get_current_user, verify_jwt_token
 from fastapi import Depends
 from utils.logger import setup_logger
-from utils.json_encoder import json_dumps, convert_numpy_types
+from utils.json_encoder import json_dumps
 from utils.error_handler import error_handler
 from utils.config import Config
 
 logger = setup_logger(__name__)
 
-app = FastAPI(title="Brightbot Trading API", version="2.0.0")
+# libuv-based event loop where available (uvloop does not support Windows, where MT5 runs)
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
+app = FastAPI(title="Brightbot Trading API", version="2.0.0", default_response_class=ORJSONResponse)
 
 @app.middleware("http")
 async def cors_handler(request, call_next):
     if request.method == "OPTIONS":
-        response = JSONResponse(content={})
+        response = ORJSONResponse(content={})
         response.headers["Access-Control-Allow-Origin"] = "*"
         response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
         response.headers["Access-Control-Allow-Headers"] = "*"
@@ -88,6 +106,10 @@ ai_predictor = EnhancedAIPredictor()
 ai_predictor.load_model()
 multi_predictor = MultiModelPredictor()
 multi_predictor.load_models()
+# Predictors aren't thread-safe, so per-tick inference runs on one dedicated worker off the event loop
+_ai_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ai")
+# Ticks for the multi-model predictor, which is only read on demand; created on startup so it binds to the serving loop
+_multi_price_queue = None
 contract_monitor = ContractMonitor()
 notification_service = NotificationService()
 market_data_service = MarketDataService()
@@ -96,30 +118,132 @@ auto_trader = AutoTrader()
 # Start notification service (will be started in startup event)
 
 class TradeManager:
+    TICK_FLUSH_SIZE = 100
+    TICK_FLUSH_INTERVAL = 1.0  # Seconds
+
     def __init__(self):
         self.active_trades = {}
         self.last_trade_time = 0
         self.MIN_TRADE_INTERVAL = 30  # Minimum seconds between trades
+        # Ticks are written in batches rather than one commit per tick
+        self.tick_buffer = []
+        self.last_tick_flush = time.monotonic()
 
     def can_trade(self):
-        current_time = asyncio.get_event_loop().time()
+        current_time = time.monotonic()
         return (current_time - self.last_trade_time) >= self.MIN_TRADE_INTERVAL and len(self.active_trades) < 3
 
+    def buffer_tick(self, price: float, last_digit: int) -> bool:
+        """Queue a tick for insertion; returns True once a flush is due"""
+        self.tick_buffer.append({"timestamp": datetime.utcnow(), "price": price, "last_digit": last_digit})
+        return (len(self.tick_buffer) >= self.TICK_FLUSH_SIZE
+                or time.monotonic() - self.last_tick_flush >= self.TICK_FLUSH_INTERVAL)
+
+    def flush_ticks(self):
+        """Insert buffered ticks in one statement and one commit"""
+        rows, self.tick_buffer = self.tick_buffer, []
+        self.last_tick_flush = time.monotonic()
+        if not rows:
+            return
+        with engine.begin() as conn:
+            conn.execute(insert(Tick), rows)
+
+    async def flush_ticks_periodically(self):
+        """Write out ticks left in the buffer when the stream goes quiet"""
+        while True:
+            await asyncio.sleep(self.TICK_FLUSH_INTERVAL / 2)
+            if (self.tick_buffer
+                    and time.monotonic() - self.last_tick_flush >= self.TICK_FLUSH_INTERVAL):
+                try:
+                    await asyncio.to_thread(self.flush_ticks)
+                except Exception as e:
+                    logger.error(f"Tick flush error: {e}")
+
 trade_manager = TradeManager()
 
+# Pre-generated uniforms for simulated demo outcomes, refilled in one batch
+_rng = numpy.random.default_rng()
+_uniform_pool = deque()
+
+def next_uniform() -> float:
+    if not _uniform_pool:
+        _uniform_pool.extend(_rng.random(4096).tolist())
+    return _uniform_pool.popleft()
+
 MAX_STAKE = 5.0  # Maximum stake per trade
 
+# Live tick strategy: DIGITMATCH on the predicted digit, fixed $5 stake
+LIVE_TRADE_STAKE = 5.0
+LIVE_TRADE_MIN_CONFIDENCE = 0.7
+_DIGITMATCH_TEMPLATE = {
+    "contract_type": "DIGITMATCH",
+    "symbol": "R_100",
+    "amount": LIVE_TRADE_STAKE,
+    "duration": 1,
+    "duration_unit": "t"
+}
+_DIGIT_STR = [str(digit) for digit in range(10)]
+
+_utc_second = None
+_utc_prefix = ""
+
+def utc_timestamp() -> str:
+    """Current UTC time as ISO-8601 with a Z suffix; everything up to the seconds is formatted once per second"""
+    global _utc_second, _utc_prefix
+    secs, nanos = divmod(time.time_ns(), 1_000_000_000)
+    if secs != _utc_second:
+        _utc_second = secs
+        _utc_prefix = datetime.utcfromtimestamp(secs).strftime("%Y-%m-%dT%H:%M:%S.")
+    return f"{_utc_prefix}{nanos // 1000:06d}Z"
+
+def _predict_tick(price: float) -> dict:
+    """Feed one tick to the predictor and return the next-digit prediction (runs on _ai_executor)"""
+    ai_predictor.add_price(price)
+    return ai_predictor.predict_next_digit()
+
+def _queue_multi_model_price(price: float):
+    if _multi_price_queue is None:
+        return
+    try:
+        _multi_price_queue.put_nowait(price)
+    except asyncio.QueueFull:
+        pass
+
+async def _drain_multi_model_prices():
+    """Hand queued ticks to the multi-model predictor in batches"""
+    loop = asyncio.get_running_loop()
+    while True:
+        prices = [await _multi_price_queue.get()]
+        while not _multi_price_queue.empty():
+            prices.append(_multi_price_queue.get_nowait())
+        try:
+            await loop.run_in_executor(_ai_executor, multi_predictor.add_prices, prices)
+        except Exception as e:
+            logger.error(f"Multi-model price update error: {e}")
+
 # Pydantic models
+# Auth lookups project only the columns they use; email has a unique index
+_EMAIL_TAKEN = select(User.id).where(User.email == bindparam("email")).limit(1)
+_LOGIN_BY_EMAIL = select(
+    User.id, User.email, User.hashed_password, User.full_name, User.balance, User.account_type
+).where(User.email == bindparam("email"))
+
+# Bounded string fields keep oversized payloads from reaching password hashing; extra keys are dropped
+_REQUEST_MODEL_CONFIG = ConfigDict(str_max_length=256, extra='ignore')
+
 class UserRegister(BaseModel):
+    model_config = _REQUEST_MODEL_CONFIG
     email: str
     password: str
     full_name: str
 
 class UserLogin(BaseModel):
+    model_config = _REQUEST_MODEL_CONFIG
     email: str
     password: str
 
 class ApiTokenUpdate(BaseModel):
+    model_config = _REQUEST_MODEL_CONFIG
     api_token: str
 
 # Include API routes
@@ -128,44 +252,40 @@ app.include_router(ai_router, prefix="/api/ai")
 app.include_router(integration_router, prefix="/api/integrations")
 
 @app.post("/api/register")
-async def register(user_data: UserRegister, db: Session = Depends(get_db)):
+def register(user_data: UserRegister, db: Session = Depends(get_db)):
     # Check if user exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
+    if db.execute(_EMAIL_TAKEN, {"email": user_data.email}).first():
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    # Create new user
-    hashed_password = hash_password(user_data.password)
-    new_user = User(
-        email=user_data.email,
-        hashed_password=hashed_password,
-        full_name=user_data.full_name,
-        balance=10000.0,
-        account_type='demo'
-    )
-    
-    db.add(new_user)
+    # Create new user; RETURNING hands back the id without re-reading the row
+    new_user = {
+        "email": user_data.email,
+        "hashed_password": hash_password(user_data.password),
+        "full_name": user_data.full_name,
+        "balance": 10000.0,
+        "account_type": 'demo'
+    }
+    user_id = db.execute(insert(User).values(**new_user).returning(User.id)).scalar_one()
     db.commit()
-    db.refresh(new_user)
     
     # Create token
-    token = create_jwt_token(new_user.id, new_user.email)
+    token = create_jwt_token(user_id, new_user["email"])
     
     return {
         "token": token,
         "user": {
-            "id": new_user.id,
-            "email": new_user.email,
-            "full_name": new_user.full_name,
-            "balance": new_user.balance,
-            "account_type": new_user.account_type
+            "id": user_id,
+            "email": new_user["email"],
+            "full_name": new_user["full_name"],
+            "balance": new_user["balance"],
+            "account_type": new_user["account_type"]
         }
     }
 
 @app.post("/api/login")
-async def login(user_data: UserLogin, db: Session = Depends(get_db)):
+def login(user_data: UserLogin, db: Session = Depends(get_db)):
     # Find user
-    user = db.query(User).filter(User.email == user_data.email).first()
+    user = db.execute(_LOGIN_BY_EMAIL, {"email": user_data.email}).first()
     if not user or not verify_password(user_data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
@@ -183,12 +303,77 @@ async def login(user_data: UserLogin, db: Session = Depends(get_db)):
         }
     }
 
+# Enum identity check per tick instead of comparing state names
+_CONNECTED = WebSocketState.CONNECTED
+
+# Binary tick frame for ?format=binary clients: price, ts_ns, last_digit, predicted digit, confidence, mode
+TICK_STRUCT = struct.Struct('<dqBBdB')
+_TICK_MODES = {'demo': 0, 'live': 1}
+_TICK_SCHEMA = json_dumps({
+    "schema": "tick_v1",
+    "format": TICK_STRUCT.format,
+    "size": TICK_STRUCT.size,
+    "fields": ["price", "timestamp_ns", "last_digit", "prediction", "confidence", "trading_mode"],
+    "trading_modes": list(_TICK_MODES),
+    # Ticks on which a live trade was placed are followed by a JSON text frame of this type
+    "text_frames": ["trade_result"]
+})
+
+async def _send_coalesced(websocket: WebSocket, outbox: asyncio.Queue, batch_json: bool = False):
+    """Send queued tick frames, merging whatever piled up since the last send.
+
+    Binary ticks are fixed-size records and are simply concatenated. JSON ticks go out one object
+    per frame unless the client opted into batching, in which case a burst arrives as one array.
+    """
+    try:
+        while True:
+            batch = [await outbox.get()]
+            while not outbox.empty():
+                batch.append(outbox.get_nowait())
+            for is_binary, run in groupby(batch, key=lambda item: isinstance(item, bytes)):
+                run = list(run)
+                if is_binary:
+                    await websocket.send_bytes(b"".join(run))
+                elif batch_json and len(run) > 1:
+                    await websocket.send_text(json_dumps(run))
+                else:
+                    for item in run:
+                        await websocket.send_text(json_dumps(item))
+            # Brief pause so bursts coalesce while sparse ticks still go out promptly
+            await asyncio.sleep(0.005)
+    except Exception as e:
+        logger.info(f"WebSocket sender stopped: {e}")
+
+def _put_latest(queue: asyncio.Queue, item):
+    """Enqueue item, evicting the oldest entry when the queue is full"""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(item)
+
+async def _read_ticks(deriv_ws, ticks: asyncio.Queue):
+    """Decode Deriv tick frames into a bounded queue; when processing falls behind the oldest tick is dropped.
+
+    A None is queued when the stream ends, whether it closed cleanly or failed.
+    """
+    try:
+        async for message in deriv_ws:
+            try:
+                tick_data = orjson.loads(message)
+            except orjson.JSONDecodeError:
+                continue
+            if "tick" in tick_data:
+                _put_latest(ticks, tick_data)
+    finally:
+        _put_latest(ticks, None)
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     logger.info("WebSocket connection established")
 
     local_trader = None
+    sender = None
+    reader = None
 
     @contextmanager
     def db_session_scope(db_session=None):
@@ -231,7 +416,7 @@ async def websocket_endpoint(websocket: WebSocket):
         
         if not connected:
             logger.error("Failed to connect to Deriv")
-            await websocket.send_text(json.dumps({"error": "Failed to connect to Deriv"}))
+            await websocket.send_text(json_dumps({"error": "Failed to connect to Deriv"}))
             await _send_simulated_data(websocket)
             return
         
@@ -239,114 +424,130 @@ async def websocket_endpoint(websocket: WebSocket):
         if local_trader.ws and (not hasattr(local_trader.ws, 'state') or local_trader.ws.state == websockets.protocol.State.OPEN):
             await local_trader.ws.send(json.dumps({"ticks": "R_100"}))
         
-        async for message in local_trader.ws:
+        # One tick object per frame by default; ?batch=1 lets a client take bursts as a single array
+        outbox = asyncio.Queue(maxsize=1024)
+        batch_json = websocket.query_params.get("batch") == "1"
+        sender = asyncio.create_task(_send_coalesced(websocket, outbox, batch_json))
+        binary_ticks = websocket.query_params.get("format") == "binary"
+        if binary_ticks:
+            await websocket.send_text(_TICK_SCHEMA)
+
+        # Reading Deriv is decoupled from processing so a slow client or prediction can't let frames pile up
+        ticks = asyncio.Queue(maxsize=64)
+        reader = asyncio.create_task(_read_ticks(local_trader.ws, ticks))
+
+        while True:
+            tick_data = await ticks.get()
+            if tick_data is None:
+                # Deriv stream ended; surface a dropped connection so the simulated fallback takes over
+                if reader.done() and not reader.cancelled() and reader.exception():
+                    raise reader.exception()
+                break
             try:
                 # Check if websocket is still open
-                if websocket.client_state.name != 'CONNECTED':
+                if websocket.client_state is not _CONNECTED:
                     logger.info("Client WebSocket disconnected")
                     break
                     
-                tick_data = json.loads(message)
-                
                 if "tick" in tick_data:
-                    price = float(tick_data["tick"]["quote"])
-                    last_digit = int(str(price).split('.')[-1][-1])
+                    tick = tick_data["tick"]
+                    price = float(tick["quote"])
+                    # Quotes carry a fixed number of decimals (pip_size, 2 on R_100), so the digit is plain arithmetic
+                    last_digit = int(round(price * 10 ** tick.get("pip_size", 2))) % 10
+
+                    _queue_multi_model_price(price)
 
                     # Add to AI predictors with error handling
                     try:
-                        ai_predictor.add_price(price)
-                        multi_predictor.add_price(price)
-                        prediction = ai_predictor.predict_next_digit()
+                        prediction = await asyncio.get_running_loop().run_in_executor(
+                            _ai_executor, _predict_tick, price
+                        )
                     except Exception as e:
                         logger.error(f"AI prediction error: {e}")
                         prediction = {"prediction": 5, "confidence": 0.5}
 
                     # Check trading mode and place real trades if live mode
-                    from api.trading_mode import get_trading_mode
                     trading_mode = get_trading_mode()
                     trade_result = None
 
-                    if trading_mode == 'live' and local_trader.authorized:
+                    # Simple trading strategy: bet on predicted digit with confidence > 0.7
+                    confidence = prediction['confidence']
+                    if trading_mode == 'live' and confidence > LIVE_TRADE_MIN_CONFIDENCE and local_trader.authorized:
                         try:
-                            current_time = asyncio.get_event_loop().time()
-
                             if trade_manager.can_trade():
-                                # Simple trading strategy: bet on predicted digit with confidence > 0.7
-                                confidence = prediction.get('confidence', 0)
-                                if confidence > 0.7:
-                                    predicted_digit = prediction.get('prediction', 5)
-
-                                    # Set a fixed stake of $5
-                                    stake = 5.0
-
-                                    # Place trade on the predicted digit
-                                    contract_request = {
-                                        "contract_type": "DIGITMATCH",
-                                        "symbol": "R_100",
-                                        "amount": stake,
-                                        "duration": 1,
-                                        "duration_unit": "t",
-                                        "barrier": str(predicted_digit)
+                                predicted_digit = prediction['prediction']
+                                stake = LIVE_TRADE_STAKE
+
+                                # Place trade on the predicted digit
+                                contract_request = {**_DIGITMATCH_TEMPLATE, "barrier": _DIGIT_STR[predicted_digit]}
+
+                                logger.info(f"Placing live trade: {contract_request} (confidence: {confidence:.2f})")
+                                # The tick socket is owned by the reader task, so orders go over a pooled connection
+                                async with deriv_pool.acquire(api_token, app_id, is_demo=not api_token) as trade_trader:
+                                    trade_result = await trade_trader.buy_contract(contract_request)
+
+                                if "buy" in trade_result:
+                                    contract_id = trade_result['buy']['contract_id']
+                                    trade_manager.active_trades[contract_id] = {
+                                        'contract_id': contract_id,
+                                        'stake': stake,
+                                        'predicted_digit': predicted_digit,
+                                        'timestamp': utc_timestamp(),
+                                        'confidence': confidence
                                     }
-
-                                    logger.info(f"Placing live trade: {contract_request} (confidence: {confidence:.2f})")
-                                    trade_result = await local_trader.buy_contract(contract_request)
-
-                                    if "buy" in trade_result:
-                                        contract_id = trade_result['buy']['contract_id']
-                                        trade_manager.active_trades[contract_id] = {
-                                            'contract_id': contract_id,
-                                            'stake': stake,
-                                            'predicted_digit': predicted_digit,
-                                            'timestamp': datetime.now().isoformat(),
-                                            'confidence': confidence
-                                        }
-                                        trade_manager.last_trade_time = current_time
-                                        logger.info(f"Trade placed successfully: {contract_id}")
-                                    elif "error" in trade_result:
-                                        logger.error(f"Trade failed: {trade_result['error']['message']}")
+                                    trade_manager.last_trade_time = time.monotonic()
+                                    logger.info(f"Trade placed successfully: {contract_id}")
+                                elif "error" in trade_result:
+                                    logger.error(f"Trade failed: {trade_result['error']['message']}")
                         except Exception as e:
                             logger.error(f"Live trading error: {e}")
 
-                    with db_session_scope() as db:
-                        tick = Tick(price=price, last_digit=last_digit)
-                        db.add(tick)
-                        db.commit()
-
-                    data = {
-                        "price": price,
-                        "last_digit": last_digit,
-                        "timestamp": datetime.now().isoformat(),
-                        "ai_prediction": prediction,
-                        "trading_mode": trading_mode
-                    }
-
-                    if trade_result:
-                        data["trade_result"] = trade_result
-
-                    data = convert_numpy_types(data)
+                    if trade_manager.buffer_tick(price, last_digit):
+                        await asyncio.to_thread(trade_manager.flush_ticks)
 
+                    if binary_ticks:
+                        data = TICK_STRUCT.pack(
+                            price, time.time_ns(), last_digit,
+                            int(prediction["prediction"]), float(confidence),
+                            _TICK_MODES.get(trading_mode, 0)
+                        )
+                    else:
+                        data = {
+                            "price": price,
+                            "last_digit": last_digit,
+                            "timestamp": utc_timestamp(),
+                            "ai_prediction": prediction,
+                            "trading_mode": trading_mode
+                        }
+
+                        if trade_result:
+                            data["trade_result"] = trade_result
+
+                    if sender.done():
+                        logger.info("WebSocket connection closed by client")
+                        break
                     try:
-                        await websocket.send_text(json_dumps(data))
-                    except Exception as e:
-                        error_msg = str(e)
-                        if any(msg in error_msg.lower() for msg in ["close", "disconnect", "connection"]):
-                            logger.info("WebSocket connection closed by client")
-                            break
-                        else:
-                            logger.error(f"WebSocket send error: {e}")
-                            continue
+                        outbox.put_nowait(data)
+                        if binary_ticks and trade_result:
+                            outbox.put_nowait({"type": "trade_result", "trade_result": trade_result})
+                    except asyncio.QueueFull:
+                        logger.warning("WebSocket client is not keeping up, closing")
+                        break
                             
-            except json.JSONDecodeError:
-                continue
             except Exception as e:
                 logger.error(f"WebSocket processing error: {e}")
                 
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
+        if sender:
+            sender.cancel()
         # Fallback to simulated data
         await _send_simulated_data(websocket)
     finally:
+        if reader:
+            reader.cancel()
+        if sender:
+            sender.cancel()
         if local_trader:
             await local_trader.close()
 
@@ -358,16 +559,17 @@ async def _send_simulated_data(websocket: WebSocket):
     while True:
         try:
             # Check if websocket is still connected
-            if websocket.client_state.name != 'CONNECTED':
+            if websocket.client_state is not _CONNECTED:
                 logger.info("Client disconnected from simulated data")
                 break
                 
             price = round(1000 + random.uniform(-50, 50), 5)
-            last_digit = int(str(price).split('.')[-1][-1])
+            last_digit = int(round(price * 100000)) % 10
 
             try:
-                ai_predictor.add_price(price)
-                prediction = ai_predictor.predict_next_digit()
+                prediction = await asyncio.get_running_loop().run_in_executor(
+                    _ai_executor, _predict_tick, price
+                )
             except Exception as e:
                 logger.error(f"AI prediction error in simulation: {e}")
                 prediction = {"prediction": 5, "confidence": 0.5}
@@ -375,11 +577,10 @@ async def _send_simulated_data(websocket: WebSocket):
             data = {
                 "price": price,
                 "last_digit": last_digit,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": utc_timestamp(),
                 "ai_prediction": prediction,
                 "simulated": True
             }
-            data = convert_numpy_types(data)
 
             await websocket.send_text(json_dumps(data))
             await asyncio.sleep(1)
@@ -401,11 +602,10 @@ async def _send_simulated_data(websocket: WebSocket):
 @app.get("/api/trading-mode")
 async def get_trading_mode_status():
     """Get current trading mode"""
-    from api.trading_mode import get_trading_mode
     return {"trading_mode": get_trading_mode()}
 
 @app.get("/api/current-user-debug")
-async def debug_current_user(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+def debug_current_user(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
     """Debug endpoint to check current user and API token status"""
     user = db.query(User).filter(User.id == current_user['user_id']).first()
     if not user:
@@ -423,9 +623,6 @@ async def debug_current_user(current_user: dict = Depends(get_current_user), db:
 @app.get("/api/test-token")
 async def test_api_token():
     """Test API token connection"""
-    import os
-    import websockets
-    
     api_token = os.getenv('DERIV_API_TOKEN')
     if not api_token:
         return {"success": False, "error": "No API token found"}
@@ -435,12 +632,12 @@ async def test_api_token():
         
         await ws.send(json.dumps({"authorize": api_token}))
         response = await asyncio.wait_for(ws.recv(), timeout=10)
-        data = json.loads(response)
+        data = orjson.loads(response)
         
         if "authorize" in data:
             await ws.send(json.dumps({"balance": 1}))
             balance_response = await asyncio.wait_for(ws.recv(), timeout=10)
-            balance_data = json.loads(balance_response)
+            balance_data = orjson.loads(balance_response)
             
             await ws.close()
             
@@ -477,7 +674,9 @@ async def sell_contract(contract_id: str):
 @app.post("/api/auto-trading/start")
 async def start_auto_trading(request_data: dict, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
     try:
-        user = db.query(User).filter(User.id == current_user['user_id']).first()
+        user = await asyncio.to_thread(
+            lambda: db.query(User).filter(User.id == current_user['user_id']).first()
+        )
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -513,14 +712,12 @@ async def start_auto_trading(request_data: dict, current_user: dict = Depends(ge
             if not user.api_token:
                 raise HTTPException(status_code=400, detail="API token required for live trading. Please set up your API token first.")
             
-            # Test connection first
-            test_trader = DerivTrader()
+            # Test connection first; the pooled socket stays open for the next trade request
             try:
-                connected = await test_trader.connect(api_token=user.api_token, is_demo=False)
-                if not connected or not test_trader.authorized:
-                    await test_trader.close()
+                async with deriv_pool.acquire(user.api_token, is_demo=False) as test_trader:
+                    authorized = test_trader.is_connected and test_trader.authorized
+                if not authorized:
                     raise HTTPException(status_code=400, detail="Failed to connect with API token. Please check your token.")
-                await test_trader.close()
             except Exception as e:
                 logger.error(f"Auto trading connection test failed: {e}")
                 raise HTTPException(status_code=400, detail=f"Connection test failed: {str(e)}")
@@ -565,10 +762,10 @@ async def get_auto_trading_status():
 @app.post("/api/demo-trade")
 async def place_demo_trade(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
     """Place a real trade on Deriv"""
-    import random
-    
     try:
-        user = db.query(User).filter(User.id == current_user['user_id']).first()
+        user = await asyncio.to_thread(
+            lambda: db.query(User).filter(User.id == current_user['user_id']).first()
+        )
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -576,24 +773,26 @@ async def place_demo_trade(current_user: dict = Depends(get_current_user), db: S
         
         if is_demo:
             # Place real demo trade on Deriv demo account
-            trader = DerivTrader()
             try:
-                connected = await trader.connect(api_token=None, is_demo=True)
-                if not connected:
-                    raise HTTPException(status_code=400, detail="Failed to connect to Deriv demo")
-                
-                # Place a DIGITEVEN trade on demo
-                trade_request = {
-                    "contract_type": "DIGITEVEN",
-                    "symbol": "R_100",
-                    "amount": 1.0,
-                    "duration": 5,
-                    "duration_unit": "t"
-                }
-                
-                result = await trader.buy_contract(trade_request)
-                
-                if "buy" in result:
+                async with deriv_pool.acquire(None, is_demo=True) as trader:
+                    if not trader.is_connected:
+                        raise HTTPException(status_code=400, detail="Failed to connect to Deriv demo")
+                    
+                    # Place a DIGITEVEN trade on demo
+                    trade_request = {
+                        "contract_type": "DIGITEVEN",
+                        "symbol": "R_100",
+                        "amount": 1.0,
+                        "duration": 5,
+                        "duration_unit": "t"
+                    }
+                    
+                    result = await trader.buy_contract(trade_request)
+                    
+                    if "buy" not in result:
+                        error_msg = result.get('error', {}).get('message', 'Unknown error')
+                        raise HTTPException(status_code=400, detail=f"Demo trade failed: {error_msg}")
+                    
                     contract_id = result['buy']['contract_id']
                     stake = 1.0
                     
@@ -602,92 +801,82 @@ async def place_demo_trade(current_user: dict = Depends(get_current_user), db: S
                     
                     # Check contract status
                     contract_info = await trader.get_contract_info(contract_id)
+                
+                if contract_info and "proposal_open_contract" in contract_info:
+                    contract = contract_info["proposal_open_contract"]
+                    payout = float(contract.get("payout", 0))
                     
-                    if contract_info and "proposal_open_contract" in contract_info:
-                        contract = contract_info["proposal_open_contract"]
-                        payout = float(contract.get("payout", 0))
-                        
-                        if payout > 0:
-                            # Win
-                            pnl = payout - stake
-                            user.balance += pnl
-                            result_text = "WIN"
-                        else:
-                            # Loss
-                            pnl = -stake
-                            user.balance -= stake
-                            result_text = "LOSS"
+                    if payout > 0:
+                        # Win
+                        pnl = payout - stake
+                        user.balance += pnl
+                        result_text = "WIN"
                     else:
-                        # Assume loss if can't get status
+                        # Loss
                         pnl = -stake
                         user.balance -= stake
                         result_text = "LOSS"
-                    
-                    db.commit()
-                    await trader.close()
-                    
-                    return {
-                        "success": True,
-                        "contract_id": contract_id,
-                        "result": result_text.lower(),
-                        "pnl": pnl,
-                        "new_balance": user.balance,
-                        "message": f"Demo trade: {result_text} - P&L: ${pnl:.2f} - Balance: ${user.balance:.2f}"
-                    }
                 else:
-                    await trader.close()
-                    error_msg = result.get('error', {}).get('message', 'Unknown error')
-                    raise HTTPException(status_code=400, detail=f"Demo trade failed: {error_msg}")
+                    # Assume loss if can't get status
+                    pnl = -stake
+                    user.balance -= stake
+                    result_text = "LOSS"
+                
+                await asyncio.to_thread(db.commit)
+                
+                return {
+                    "success": True,
+                    "contract_id": contract_id,
+                    "result": result_text.lower(),
+                    "pnl": pnl,
+                    "new_balance": user.balance,
+                    "message": f"Demo trade: {result_text} - P&L: ${pnl:.2f} - Balance: ${user.balance:.2f}"
+                }
                     
             except Exception as e:
-                await trader.close()
                 raise HTTPException(status_code=500, detail=f"Demo trading error: {str(e)}")
         else:
             # Place real trade on Deriv for live mode
             if not user.api_token:
                 raise HTTPException(status_code=400, detail="API token required for live trading")
             
-            trader = DerivTrader()
             try:
-                connected = await trader.connect(api_token=user.api_token, is_demo=False)
-                if not connected or not trader.authorized:
-                    raise HTTPException(status_code=400, detail="Failed to connect to Deriv")
-                
-                # Place a DIGITEVEN trade
-                trade_request = {
-                    "contract_type": "DIGITEVEN",
-                    "symbol": "R_100",
-                    "amount": 1.0,
-                    "duration": 5,
-                    "duration_unit": "t"
-                }
-                
-                result = await trader.buy_contract(trade_request)
-                
-                if "buy" in result:
+                async with deriv_pool.acquire(user.api_token, is_demo=False) as trader:
+                    if not trader.is_connected or not trader.authorized:
+                        raise HTTPException(status_code=400, detail="Failed to connect to Deriv")
+                    
+                    # Place a DIGITEVEN trade
+                    trade_request = {
+                        "contract_type": "DIGITEVEN",
+                        "symbol": "R_100",
+                        "amount": 1.0,
+                        "duration": 5,
+                        "duration_unit": "t"
+                    }
+                    
+                    result = await trader.buy_contract(trade_request)
+                    
+                    if "buy" not in result:
+                        error_msg = result.get('error', {}).get('message', 'Unknown error')
+                        raise HTTPException(status_code=400, detail=f"Trade failed: {error_msg}")
+                    
                     contract_id = result['buy']['contract_id']
                     
                     # Get updated balance
                     new_balance = await trader.get_balance()
-                    if new_balance:
-                        user.balance = new_balance
-                        db.commit()
-                    
-                    await trader.close()
-                    
-                    return {
-                        "success": True,
-                        "contract_id": contract_id,
-                        "new_balance": new_balance or user.balance,
-                        "message": f"Live trade placed: {contract_id} - Balance: ${new_balance or user.balance:.2f}"
-                    }
-                else:
-                    await trader.close()
-                    error_msg = result.get('error', {}).get('message', 'Unknown error')
-                    raise HTTPException(status_code=400, detail=f"Trade failed: {error_msg}")
+                
+                if new_balance:
+                    user.balance = new_balance
+                    await asyncio.to_thread(db.commit)
+                
+                return {
+                    "success": True,
+                    "contract_id": contract_id,
+                    "new_balance": new_balance or user.balance,
+                    "message": f"Live trade placed: {contract_id} - Balance: ${new_balance or user.balance:.2f}"
+                }
                     
             except Exception as e:
-                await trader.close()
                 raise HTTPException(status_code=500, detail=f"Trading error: {str(e)}")
                 
     except HTTPException:
@@ -703,8 +892,8 @@ async def get_multi_predictions():
 
         predictions = multi_predictor.predict_all_models()
 
-        predictions = convert_numpy_types(predictions)
-        return {"success": True, "predictions": predictions}
+        # orjson serializes numpy scalars natively; returning the response skips jsonable_encoder
+        return ORJSONResponse({"success": True, "predictions": predictions})
     except Exception as e:
         logger.error(f"Multi-prediction error: {e}")
         return {"success": False, "error": str(e)}
@@ -724,14 +913,14 @@ async def monitor_trades():
     """Background task to monitor active trades and update their status"""
     while True:
         try:
-            if trade_manager.active_trades:
-                # Create a temporary trader instance to check trade status
-                temp_trader = DerivTrader()
-                api_token = os.getenv('DERIV_API_TOKEN')
-
-                if api_token:
-                    connected = await temp_trader.connect(api_token=api_token, is_demo=False)
-                    if connected and temp_trader.authorized and trade_manager.active_trades:
+            api_token = os.getenv('DERIV_API_TOKEN')
+            if (trade_manager.active_trades or signal_processor.active_signals) and api_token:
+                # Same pool key as the startup warmup, so the authorized socket is reused between checks
+                async with deriv_pool.acquire(api_token, Config.DERIV_APP_ID) as temp_trader:
+                    if temp_trader.authorized and signal_processor.active_signals:
+                        await signal_processor.settle_open_signals(temp_trader)
+
+                    if temp_trader.authorized and trade_manager.active_trades:
                         # Check each active trade
                         completed_trades = []
                         for contract_id, trade_info in list(trade_manager.active_trades.items()):
@@ -752,7 +941,7 @@ async def monitor_trades():
                                             'status': status,
                                             'payout': payout,
                                             'profit_loss': profit_loss,
-                                            'completed_at': datetime.now().isoformat()
+                                            'completed_at': utc_timestamp()
                                         })
 
                                         logger.info(f"Trade {contract_id} completed: {status}, P/L: {profit_loss:.2f}")
@@ -767,8 +956,6 @@ async def monitor_trades():
                         for contract_id in completed_trades:
                             del trade_manager.active_trades[contract_id]
 
-                    await temp_trader.close()
-
         except Exception as e:
             logger.error(f"Trade monitoring error: {e}")
 
@@ -778,8 +965,20 @@ async def monitor_trades():
 @app.on_event("startup")
 async def startup_event():
     """Start background tasks on startup"""
+    global _multi_price_queue
+    _multi_price_queue = asyncio.Queue(maxsize=256)
+    asyncio.create_task(_drain_multi_model_prices())
     asyncio.create_task(monitor_trades())
+    asyncio.create_task(trade_manager.flush_ticks_periodically())
     asyncio.create_task(notification_service.start_notification_worker())
+    if Config.DERIV_API_TOKEN:
+        asyncio.create_task(deriv_pool.warmup(Config.DERIV_API_TOKEN, Config.DERIV_APP_ID))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush buffered ticks and close pooled Deriv connections"""
+    await asyncio.to_thread(trade_manager.flush_ticks)
+    await deriv_pool.close_all()
 
 @app.post("/api/update-balance")
 async def update_balance(amount_data: dict, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
@@ -804,7 +1003,6 @@ async def start_demo_auto_trading(user_id: int):
     """Demo auto trading with simulated trades"""
     logger.info(f"Starting DEMO auto trading for user {user_id}")
     
-    import random
     demo_balance = 10000.0
     
     try:
@@ -814,7 +1012,7 @@ async def start_demo_auto_trading(user_id: int):
                 
             # Simulate trade
             stake = 1.0
-            win = random.random() > 0.5
+            win = next_uniform() > 0.5
             
             if win:
                 payout = stake * 1.8
@@ -871,8 +1069,6 @@ async def start_simple_auto_trading(user_id: int, api_token: str):
         auto_trader.is_running = False
         return
     
-    import random
-    
     try:
         for i in range(5):
             if not auto_trader.is_running:
@@ -926,4 +1122,6 @@ async def start_simple_auto_trading(user_id: int, api_token: str):
 if __name__ == "__main__":
     import uvicorn
     print("Starting server with live trading capabilities...")
-    uvicorn.run("main_new:app", host="127.0.0.1", port=8001, reload=True)
+    # "auto" picks uvloop and httptools from uvicorn[standard] and falls back to asyncio/h11 on Windows
+    uvicorn.run("main_new:app", host="127.0.0.1", port=8001, reload=True, loop="auto", http="auto",
+                ws="websockets", ws_per_message_deflate=False)
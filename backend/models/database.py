@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Index, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
@@ -28,7 +28,7 @@ class Trade(Base):
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'))
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, server_default=func.now())
     stake = Column(Float, nullable=False)
     prediction = Column(Integer)
     result = Column(String)
@@ -42,6 +42,10 @@ class Trade(Base):
     user = relationship("User", back_populates="trades")
     strategy = relationship("Strategy", back_populates="trades")
 
+# Per-user trade lists are always read newest first
+Index("ix_trade_user_ts", Trade.user_id, Trade.timestamp.desc())
+Index("ix_trade_user_result", Trade.user_id, Trade.result)
+
 class Strategy(Base):
     __tablename__ = "strategies"
     
@@ -69,12 +73,20 @@ class Tick(Base):
     last_digit = Column(Integer)
     symbol = Column(String, default='R_100')
 
+Index("ix_tick_ts", Tick.timestamp.desc())
+
 # Database setup
-engine = create_engine(Config.DATABASE_URL)
+# Sessions are used from worker threads, so SQLite must not pin connections to their creating thread
+_connect_args = {"check_same_thread": False} if Config.DATABASE_URL.startswith("sqlite") else {}
+engine = create_engine(Config.DATABASE_URL, query_cache_size=1200, pool_pre_ping=True, connect_args=_connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so add new indexes to existing databases too
+    for table in (Trade.__table__, Tick.__table__):
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 def get_db():
     db = SessionLocal()
@@ -0,0 +1,167 @@
+import asyncio
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Set, Tuple
+import websockets
+from services.deriv_trader import DerivTrader
+from utils.config import Config
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class DerivTraderPool:
+    """Keeps authorized Deriv connections open between requests, keyed by credentials"""
+
+    def __init__(self, idle_timeout: float = 300, reap_interval: float = 30,
+                 max_concurrent_dials: int = Config.DERIV_MAX_CONCURRENT):
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        self.max_concurrent_dials = max_concurrent_dials
+        self._dial_semaphore: Optional[asyncio.Semaphore] = None
+        self._traders: Dict[Tuple, DerivTrader] = {}
+        self._locks: Dict[Tuple, asyncio.Lock] = {}
+        # Callers inside or queued in acquire() per key; a key's lock is dropped once this hits zero
+        # with no pooled trader left, so unused credentials don't accumulate locks
+        self._holders: Counter = Counter()
+        self._last_used: Dict[Tuple, float] = {}
+        self._reaper_task: Optional[asyncio.Task] = None
+        self._closers: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def _is_alive(trader: DerivTrader) -> bool:
+        ws = trader.ws
+        if not ws or not trader.is_connected or trader.awaiting_reply:
+            return False
+        return not hasattr(ws, 'state') or ws.state == websockets.protocol.State.OPEN
+
+    def _dials(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running loop rather than the import-time one
+        if self._dial_semaphore is None:
+            self._dial_semaphore = asyncio.Semaphore(self.max_concurrent_dials)
+        return self._dial_semaphore
+
+    def _lock_for(self, key: Tuple) -> asyncio.Lock:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    def _release_lock(self, key: Tuple):
+        if not self._holders[key]:
+            self._holders.pop(key, None)
+            if key not in self._traders:
+                self._locks.pop(key, None)
+
+    @asynccontextmanager
+    async def acquire(self, api_token: Optional[str], app_id: Optional[str] = None,
+                      is_demo: bool = False, connect_timeout: float = 15):
+        """Yield a connected trader for the given credentials.
+
+        The socket is request/response, so the trader is held exclusively for the
+        duration of the block. Any error inside the block evicts the connection,
+        since a timed-out request may leave an unread reply on the socket; so does
+        a request that timed out inside DerivTrader without raising.
+        """
+        key = (api_token, app_id, is_demo)
+        self._ensure_reaper()
+
+        self._holders[key] += 1
+        try:
+            async with self._lock_for(key):
+                trader = self._traders.get(key)
+                if trader is None or not self._is_alive(trader):
+                    if trader is not None:
+                        self._discard(key)
+                        self._close_in_background(trader)
+                    trader = DerivTrader()
+                    try:
+                        async with self._dials():
+                            connected = await asyncio.wait_for(
+                                trader.connect(api_token=api_token, app_id=app_id, is_demo=is_demo),
+                                timeout=connect_timeout
+                            )
+                    except BaseException:
+                        await trader.close()
+                        raise
+                    if connected and trader.authorized:
+                        self._traders[key] = trader
+
+                try:
+                    yield trader
+                except BaseException:
+                    await self._evict(key, trader)
+                    raise
+
+                if self._traders.get(key) is not trader:
+                    self._close_in_background(trader)
+                elif self._is_alive(trader):
+                    self._last_used[key] = time.monotonic()
+                else:
+                    self._discard(key)
+                    self._close_in_background(trader)
+        finally:
+            self._holders[key] -= 1
+            self._release_lock(key)
+
+    async def warmup(self, api_token: str, app_id: Optional[str] = None, is_demo: bool = False):
+        """Open a pooled connection ahead of the first request"""
+        try:
+            async with self.acquire(api_token, app_id, is_demo) as trader:
+                logger.info(f"Deriv pool warmed up - Authorized: {trader.authorized}")
+        except Exception as e:
+            logger.warning(f"Deriv pool warmup failed: {e}")
+
+    def _discard(self, key: Tuple) -> Optional[DerivTrader]:
+        self._last_used.pop(key, None)
+        return self._traders.pop(key, None)
+
+    def _close_in_background(self, trader: DerivTrader):
+        """Close a socket nobody else holds without making the caller wait for the handshake"""
+        task = asyncio.create_task(trader.close())
+        self._closers.add(task)
+        task.add_done_callback(self._closers.discard)
+
+    async def _evict(self, key: Tuple, trader: Optional[DerivTrader] = None):
+        pooled = self._discard(key)
+        if pooled is not None:
+            await pooled.close()
+        if trader is not None and trader is not pooled:
+            await trader.close()
+
+    def _ensure_reaper(self):
+        if self._reaper_task is None or self._reaper_task.done():
+            self._reaper_task = asyncio.create_task(self._reap_idle())
+
+    async def _reap_idle(self):
+        """Close connections idle for idle_timeout seconds and keep the others alive"""
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            now = time.monotonic()
+            for key, last_used in list(self._last_used.items()):
+                lock = self._lock_for(key)
+                if lock.locked() or now - last_used < self.reap_interval:
+                    continue
+                async with lock:
+                    trader = self._traders.get(key)
+                    if trader is None:
+                        pass
+                    elif now - last_used > self.idle_timeout:
+                        logger.info("Closing idle pooled Deriv connection")
+                        await self._evict(key)
+                    elif not await trader.ping():
+                        logger.info("Dropping pooled Deriv connection that failed keepalive")
+                        await self._evict(key)
+                self._release_lock(key)
+
+    async def close_all(self):
+        if self._reaper_task:
+            self._reaper_task.cancel()
+            self._reaper_task = None
+        for key in list(self._traders):
+            await self._evict(key)
+        if self._closers:
+            await asyncio.gather(*self._closers, return_exceptions=True)
+
+# Global pool instance
+deriv_pool = DerivTraderPool()
@@ -1,5 +1,7 @@
 import asyncio
 import json
+import ssl
+import time
 import websockets
 from typing import Optional, Dict, Any
 from utils.config import Config
@@ -7,13 +9,33 @@ from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Loading the CA bundle is blocking CPU work; do it once instead of on every wss:// connect
+_SSL_CONTEXT = ssl.create_default_context()
+
 class DerivTrader:
     def __init__(self):
         self.ws = None
         self.is_connected = False
         self.authorized = False
         self.reconnect_count = 0
+        self.authorize_response: Dict[str, Any] = {}
+        self._authorized_balance: Optional[float] = None
+        self._authorized_at = 0.0
+        # Set while a request's reply is outstanding; stays set if the reply never arrived
+        self.awaiting_reply = False
         
+    async def _request(self, payload: Dict, timeout: float) -> Dict:
+        """Send one request and read its reply.
+
+        If the read times out or fails, awaiting_reply stays True: the late reply would be read as
+        the answer to the next request, so the connection must not be reused.
+        """
+        self.awaiting_reply = True
+        await self.ws.send(json.dumps(payload))
+        response = await asyncio.wait_for(self.ws.recv(), timeout=timeout)
+        self.awaiting_reply = False
+        return json.loads(response)
+
     async def connect(self, api_token: Optional[str] = None, app_id: Optional[str] = None, is_demo: bool = True):
         """Connect to Deriv with robust reconnection logic"""
         config_app_id = Config.DERIV_DEMO_APP_ID if is_demo else Config.DERIV_LIVE_APP_ID
@@ -25,12 +47,14 @@ class DerivTrader:
                 logger.info(f"Connecting to Deriv - URL: {url}, Demo: {is_demo}, API Token: {bool(api_token)}")
                 self.ws = await websockets.connect(
                     url,
+                    ssl=_SSL_CONTEXT if url.startswith("wss://") else None,
                     ping_interval=30,
                     ping_timeout=10,
                     close_timeout=5
                 )
                 self.is_connected = True
                 self.reconnect_count = 0
+                self.awaiting_reply = False
 
                 # For demo mode, we don't need authorization
                 if api_token and not is_demo:
@@ -62,14 +86,16 @@ class DerivTrader:
         try:
             auth_request = {"authorize": api_token}
             logger.info(f"Sending authorization request")
-            await self.ws.send(json.dumps(auth_request))
-            
-            response = await asyncio.wait_for(self.ws.recv(), timeout=15)
-            data = json.loads(response)
+            data = await self._request(auth_request, timeout=15)
             logger.info(f"Auth response received")
             
             if "authorize" in data:
                 self.authorized = True
+                self.authorize_response = data["authorize"]
+                # The authorize reply already carries the account balance
+                if "balance" in self.authorize_response:
+                    self._authorized_balance = float(self.authorize_response["balance"])
+                    self._authorized_at = time.monotonic()
                 logger.info(f"Authorization successful - Account: {data['authorize'].get('loginid', 'Unknown')}")
                 return data["authorize"]
             elif "error" in data:
@@ -113,9 +139,9 @@ class DerivTrader:
             }
 
             logger.info(f"Placing trade: {buy_request}")
-            await self.ws.send(json.dumps(buy_request))
-            response = await asyncio.wait_for(self.ws.recv(), timeout=20)
-            result = json.loads(response)
+            # The stake comes out of the balance, so the one from the authorize reply is stale from here on
+            self._authorized_balance = None
+            result = await self._request(buy_request, timeout=20)
             logger.info(f"Trade response: {result}")
 
             if "buy" in result:
@@ -135,15 +161,18 @@ class DerivTrader:
         if not self.authorized or not self.ws or (hasattr(self.ws, 'state') and self.ws.state != websockets.protocol.State.OPEN):
             logger.error("Not authorized or WebSocket closed")
             return None
+
+        # A read right after authorizing is served from the authorize payload
+        if self._authorized_balance is not None:
+            balance, self._authorized_balance = self._authorized_balance, None
+            if time.monotonic() - self._authorized_at < 5:
+                return balance
         
         for attempt in range(3):
             try:
                 balance_request = {"balance": 1}
                 logger.info(f"Requesting balance (attempt {attempt + 1})")
-                await self.ws.send(json.dumps(balance_request))
-                
-                response = await asyncio.wait_for(self.ws.recv(), timeout=15)
-                data = json.loads(response)
+                data = await self._request(balance_request, timeout=15)
                 logger.info(f"Balance response received")
                 
                 if "balance" in data:
@@ -159,7 +188,11 @@ class DerivTrader:
                     logger.error(f"Balance error: {data['error']['message']}")
                     return None
                     
-            except (asyncio.TimeoutError, ValueError) as e:
+            except asyncio.TimeoutError:
+                # Retrying here would read the late reply to this request; leave it to a fresh socket
+                logger.error(f"Balance fetch attempt {attempt + 1} timed out")
+                return None
+            except ValueError as e:
                 logger.error(f"Balance fetch attempt {attempt + 1} failed: {e}")
                 if attempt < 2:
                     await asyncio.sleep(2)
@@ -169,6 +202,18 @@ class DerivTrader:
                     
         return None
     
+    async def ping(self) -> bool:
+        """Application-level keepalive; Deriv drops sockets that send no requests for a while"""
+        if not self.ws or (hasattr(self.ws, 'state') and self.ws.state != websockets.protocol.State.OPEN):
+            return False
+
+        try:
+            response = await self._request({"ping": 1}, timeout=10)
+            return response.get("ping") == "pong"
+        except Exception as e:
+            logger.warning(f"Keepalive ping failed: {e}")
+            return False
+
     async def get_contract_info(self, contract_id: str) -> Optional[Dict]:
         """Get contract information by contract ID"""
         if not self.authorized or not self.ws or (hasattr(self.ws, 'state') and self.ws.state != websockets.protocol.State.OPEN):
@@ -182,10 +227,7 @@ class DerivTrader:
             }
 
             logger.info(f"Requesting contract info for {contract_id}")
-            await self.ws.send(json.dumps(contract_request))
-
-            response = await asyncio.wait_for(self.ws.recv(), timeout=15)
-            data = json.loads(response)
+            data = await self._request(contract_request, timeout=15)
             logger.info(f"Contract info response received")
 
             if "proposal_open_contract" in data:
@@ -216,3 +258,6 @@ class DerivTrader:
         self.ws = None
         self.is_connected = False
         self.authorized = False
+        self.authorize_response = {}
+        self._authorized_balance = None
+        self.awaiting_reply = False
@@ -1,4 +1,5 @@
 import asyncio
+import time
 import aiohttp
 import smtplib
 from email.mime.text import MIMEText
@@ -108,7 +109,7 @@ P&L: ${pnl:.2f}
             'type': notification_type,
             'message': message,
             'data': data,
-            'timestamp': asyncio.get_event_loop().time()
+            'timestamp': time.monotonic()
         }
 
         await self.notification_queue.put(notification)
@@ -0,0 +1,17 @@
+import os
+import sys
+import tempfile
+import types
+
+# Backend modules import each other from the backend root (e.g. `from services.deriv_pool import ...`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Point the engine at a throwaway database before models.database is first imported
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+
+# MetaTrader5 only ships Windows wheels; an empty module lets main_new and the MT5 integration
+# import elsewhere. Nothing under test calls into the terminal API.
+try:
+    import MetaTrader5  # noqa: F401
+except ImportError:
+    sys.modules["MetaTrader5"] = types.ModuleType("MetaTrader5")
@@ -0,0 +1,46 @@
+import pytest
+
+from api import routes
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    routes._balance_cache.clear()
+    yield
+    routes._balance_cache.clear()
+
+
+def test_expired_balances_are_pruned_on_write(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(routes.time, "monotonic", lambda: now[0])
+    routes._store_balance(("old-token", "1089"), None, False)
+
+    now[0] += routes._BALANCE_TTL
+    routes._store_balance(("new-token", "1089"), 12.5, True)
+
+    assert list(routes._balance_cache) == [("new-token", "1089")]
+
+
+def test_cache_is_capped_by_evicting_the_oldest(monkeypatch):
+    monkeypatch.setattr(routes, "_BALANCE_CACHE_SIZE", 3)
+    for i in range(5):
+        routes._store_balance((f"token-{i}", "1089"), float(i), False)
+
+    assert list(routes._balance_cache) == [("token-2", "1089"), ("token-3", "1089"), ("token-4", "1089")]
+
+
+def test_refreshing_a_token_moves_it_to_the_back(monkeypatch):
+    monkeypatch.setattr(routes, "_BALANCE_CACHE_SIZE", 2)
+    routes._store_balance(("a", "1089"), 1.0, False)
+    routes._store_balance(("b", "1089"), 2.0, False)
+    routes._store_balance(("a", "1089"), 3.0, False)
+    routes._store_balance(("c", "1089"), 4.0, False)
+
+    assert list(routes._balance_cache) == [("a", "1089"), ("c", "1089")]
+
+
+
+def test_balance_prompt_requires_authentication():
+    route = next(r for r in routes.router.routes if r.path == "/balance" and "GET" in r.methods)
+
+    assert routes.get_current_user in [dep.call for dep in route.dependant.dependencies]
@@ -0,0 +1,222 @@
+import asyncio
+
+import pytest
+
+from services import deriv_pool as deriv_pool_module
+from services.deriv_pool import DerivTraderPool
+
+
+class FakeTrader:
+    """Stands in for DerivTrader so the pool can be exercised without a Deriv socket"""
+    dial_delay = 0.0
+    authorize = True
+
+    def __init__(self):
+        self.ws = None
+        self.is_connected = False
+        self.authorized = False
+        self.closed = False
+        self.pings = 0
+        self.awaiting_reply = False
+
+    async def connect(self, api_token=None, app_id=None, is_demo=True):
+        FakeTrader.dialing += 1
+        FakeTrader.max_dialing = max(FakeTrader.max_dialing, FakeTrader.dialing)
+        try:
+            await asyncio.sleep(self.dial_delay)
+        finally:
+            FakeTrader.dialing -= 1
+        self.ws = object()
+        self.is_connected = True
+        self.authorized = self.authorize
+        FakeTrader.created.append(self)
+        return True
+
+    async def ping(self):
+        self.pings += 1
+        return True
+
+    async def close(self):
+        self.closed = True
+        self.is_connected = False
+
+
+@pytest.fixture(autouse=True)
+def fake_trader(monkeypatch):
+    FakeTrader.created = []
+    FakeTrader.dialing = 0
+    FakeTrader.max_dialing = 0
+    monkeypatch.setattr(deriv_pool_module, "DerivTrader", FakeTrader)
+    yield FakeTrader
+    FakeTrader.dial_delay = 0.0
+    FakeTrader.authorize = True
+
+
+def _run(coro_fn, **pool_kwargs):
+    async def run():
+        pool = DerivTraderPool(**pool_kwargs)
+        try:
+            return await coro_fn(pool)
+        finally:
+            await pool.close_all()
+    return asyncio.run(run())
+
+
+def test_connection_is_reused_for_the_same_credentials():
+    async def scenario(pool):
+        async with pool.acquire("token", "1089") as first:
+            pass
+        async with pool.acquire("token", "1089") as second:
+            pass
+        return first, second, first.closed
+
+    first, second, closed_while_pooled = _run(scenario)
+
+    assert first is second
+    assert len(FakeTrader.created) == 1
+    assert not closed_while_pooled
+
+
+def test_different_credentials_get_separate_connections():
+    async def scenario(pool):
+        async with pool.acquire("token", "1089") as live:
+            pass
+        async with pool.acquire("token", "1089", is_demo=True) as demo:
+            pass
+        return live, demo
+
+    live, demo = _run(scenario)
+
+    assert live is not demo
+
+
+def test_error_inside_the_block_evicts_and_closes_the_connection():
+    async def scenario(pool):
+        with pytest.raises(RuntimeError):
+            async with pool.acquire("token") as broken:
+                raise RuntimeError("timed out mid-request")
+        async with pool.acquire("token") as fresh:
+            pass
+        return broken, fresh, fresh.closed
+
+    broken, fresh, fresh_closed = _run(scenario)
+
+    assert broken.closed
+    assert fresh is not broken
+    assert not fresh_closed
+
+
+def test_request_that_timed_out_without_raising_evicts_the_connection():
+    async def scenario(pool):
+        async with pool.acquire("token") as stale:
+            # DerivTrader methods swallow their own timeouts; the late reply is still on the socket
+            stale.awaiting_reply = True
+        await asyncio.sleep(0)  # let the background close run
+        async with pool.acquire("token") as fresh:
+            pass
+        return stale, fresh
+
+    stale, fresh = _run(scenario)
+
+    assert stale.closed
+    assert fresh is not stale
+
+
+def test_unauthorized_connection_is_not_pooled():
+    FakeTrader.authorize = False
+
+    async def scenario(pool):
+        async with pool.acquire("bad-token") as first:
+            pass
+        await asyncio.sleep(0)  # let the background close run
+        async with pool.acquire("bad-token") as second:
+            pass
+        return first, second
+
+    first, second = _run(scenario)
+
+    assert first.closed
+    assert second is not first
+
+
+def test_same_key_is_held_exclusively():
+    events = []
+
+    async def use(pool, name):
+        async with pool.acquire("token"):
+            events.append(f"{name} in")
+            await asyncio.sleep(0.01)
+            events.append(f"{name} out")
+
+    async def scenario(pool):
+        await asyncio.gather(use(pool, "a"), use(pool, "b"))
+
+    _run(scenario)
+
+    assert events == ["a in", "a out", "b in", "b out"]
+    assert len(FakeTrader.created) == 1
+
+
+def test_concurrent_dials_are_limited():
+    FakeTrader.dial_delay = 0.01
+
+    async def scenario(pool):
+        async def use(token):
+            async with pool.acquire(token):
+                pass
+        await asyncio.gather(*(use(f"token-{i}") for i in range(4)))
+
+    _run(scenario, max_concurrent_dials=2)
+
+    assert len(FakeTrader.created) == 4
+    assert FakeTrader.max_dialing == 2
+
+
+def test_reaper_closes_idle_connections():
+    async def scenario(pool):
+        async with pool.acquire("token") as trader:
+            pass
+        await asyncio.sleep(0.05)
+        return trader, dict(pool._traders)
+
+    trader, pooled = _run(scenario, idle_timeout=0.0, reap_interval=0.01)
+
+    assert trader.closed
+    assert pooled == {}
+
+
+def test_reaper_pings_connections_that_are_not_yet_idle():
+    async def scenario(pool):
+        async with pool.acquire("token") as trader:
+            pass
+        await asyncio.sleep(0.05)
+        return trader
+
+    trader = _run(scenario, idle_timeout=60.0, reap_interval=0.01)
+
+    assert trader.pings > 0
+
+
+def test_locks_are_dropped_together_with_their_connection():
+    async def scenario(pool):
+        FakeTrader.authorize = False
+        async with pool.acquire("random-token"):
+            pass
+        unauthorized_locks = set(pool._locks)
+
+        FakeTrader.authorize = True
+        async with pool.acquire("token"):
+            pass
+        pooled_locks = set(pool._locks)
+
+        with pytest.raises(RuntimeError):
+            async with pool.acquire("token"):
+                raise RuntimeError("boom")
+        return unauthorized_locks, pooled_locks, set(pool._locks), dict(pool._holders)
+
+    unauthorized_locks, pooled_locks, evicted_locks, holders = _run(scenario)
+
+    assert unauthorized_locks == set()
+    assert pooled_locks == {("token", None, False)}
+    assert evicted_locks == set()
+    assert holders == {}
@@ -0,0 +1,39 @@
+import asyncio
+
+from integrations import websocket as websocket_module
+from integrations.websocket import IntegrationWebSocketManager
+
+
+class StalledSocket:
+    """A client that accepts the connection but never finishes reading a frame"""
+
+    def __init__(self):
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def send_bytes(self, payload):
+        await asyncio.Event().wait()
+
+    async def close(self, code=1000, reason=None):
+        self.close_code = code
+
+
+def test_slow_client_is_dropped_and_told_to_reconnect(monkeypatch):
+    monkeypatch.setattr(websocket_module.mt5_client, "connected", False)
+
+    async def scenario():
+        manager = IntegrationWebSocketManager()
+        client = StalledSocket()
+        await manager.connect(client)
+        for _ in range(manager.OUTBOX_SIZE + 2):
+            await manager._broadcast_message({"type": "tradingview_signal"})
+        await asyncio.sleep(0.01)
+        return manager, client
+
+    manager, client = asyncio.run(scenario())
+
+    assert client.close_code == 1013
+    assert manager.active_connections == {}
+    assert manager._broadcaster_task is None
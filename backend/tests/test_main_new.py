@@ -0,0 +1,104 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import orjson
+import pytest
+
+import main_new
+
+
+def test_binary_tick_is_a_27_byte_little_endian_record():
+    assert main_new.TICK_STRUCT.size == 27
+
+    record = main_new.TICK_STRUCT.pack(1234.56, 1_700_000_000_123_456_789, 6, 7, 0.82, main_new._TICK_MODES["live"])
+
+    assert len(record) == 27
+    price, ts_ns, last_digit, predicted, confidence, mode = main_new.TICK_STRUCT.unpack(record)
+    assert (price, ts_ns, last_digit, predicted, mode) == (1234.56, 1_700_000_000_123_456_789, 6, 7, 1)
+    assert confidence == pytest.approx(0.82)
+
+
+def test_binary_tick_records_concatenate_without_framing():
+    records = b"".join(main_new.TICK_STRUCT.pack(1000.0 + i, i, i, i, 0.5, 0) for i in range(3))
+
+    prices = [fields[0] for fields in main_new.TICK_STRUCT.iter_unpack(records)]
+    assert prices == [1000.0, 1001.0, 1002.0]
+
+
+def test_tick_schema_describes_the_record_layout():
+    schema = orjson.loads(main_new._TICK_SCHEMA)
+
+    assert schema["format"] == main_new.TICK_STRUCT.format
+    assert schema["size"] == main_new.TICK_STRUCT.size
+    assert schema["trading_modes"] == ["demo", "live"]
+    assert schema["text_frames"] == ["trade_result"]
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.frames = []
+
+    async def send_bytes(self, data):
+        self.frames.append(data)
+
+    async def send_text(self, data):
+        self.frames.append(orjson.loads(data))
+
+
+def _send_all(items, batch_json=False):
+    async def run():
+        websocket = RecordingSocket()
+        outbox = asyncio.Queue()
+        for item in items:
+            outbox.put_nowait(item)
+        sender = asyncio.create_task(main_new._send_coalesced(websocket, outbox, batch_json))
+        await asyncio.sleep(0.02)
+        sender.cancel()
+        return websocket.frames
+    return asyncio.run(run())
+
+
+def test_trade_result_follows_a_binary_tick_as_its_own_text_frame():
+    record = main_new.TICK_STRUCT.pack(1000.0, 1, 0, 0, 0.9, 1)
+    trade = {"type": "trade_result", "trade_result": {"buy": {"contract_id": 1}}}
+
+    assert _send_all([record, trade]) == [record, trade]
+
+
+def test_json_ticks_go_out_one_object_per_frame_unless_batched():
+    ticks = [{"price": 1.0}, {"price": 2.0}]
+
+    assert _send_all(ticks) == ticks
+    assert _send_all(ticks, batch_json=True) == [ticks]
+
+
+def test_utc_timestamp_is_iso_utc_with_microseconds():
+    before = datetime.utcnow()
+    stamp = main_new.utc_timestamp()
+    after = datetime.utcnow()
+
+    assert stamp.endswith("Z")
+    parsed = datetime.strptime(stamp, "%Y-%m-%dT%H:%M:%S.%fZ")
+    assert before - timedelta(seconds=1) <= parsed <= after + timedelta(seconds=1)
+
+
+def test_startup_starts_background_tasks_and_shutdown_flushes(monkeypatch):
+    # Keep the warmup from dialing Deriv
+    monkeypatch.setattr(main_new.Config, "DERIV_API_TOKEN", None)
+
+    async def start_and_stop():
+        before = asyncio.all_tasks()
+        await main_new.startup_event()
+        await asyncio.sleep(0.05)
+        started = asyncio.all_tasks() - before
+        failed = [task for task in started if task.done() and not task.cancelled() and task.exception()]
+        for task in started:
+            task.cancel()
+        await asyncio.gather(*started, return_exceptions=True)
+        await main_new.shutdown_event()
+        return started, failed
+
+    started, failed = asyncio.run(start_and_stop())
+
+    assert started
+    assert failed == []
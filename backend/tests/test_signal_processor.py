@@ -0,0 +1,116 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from integrations.signal_processor import SignalProcessor
+
+
+@pytest.fixture
+def processor():
+    return SignalProcessor()
+
+
+def _track(processor, contract_id, symbol="R_100"):
+    signal = {"symbol": symbol, "action": "buy", "price": 1.0}
+    processor._log_signal_execution(signal, "TradingView", {"contract_id": contract_id})
+
+
+def _stake(processor, **signal):
+    return asyncio.run(processor._calculate_stake(signal))
+
+
+def test_stake_is_fractional_kelly_of_base_capital(processor):
+    # k = 0.55 - 0.45 / 1.0 = 0.1 -> 0.1 * 0.25 * 0.6 * 100
+    assert _stake(processor, win_rate=0.55, confidence=0.6) == 1.5
+
+
+@pytest.mark.parametrize("win_rate", [0.5, 0.4, 0.0])
+def test_no_edge_means_no_stake(processor, win_rate):
+    assert _stake(processor, win_rate=win_rate, confidence=1.0) == 0.0
+
+
+def test_small_edge_is_raised_to_the_minimum_stake(processor):
+    assert _stake(processor, win_rate=0.51, confidence=0.6) == processor.MIN_STAKE
+
+
+def test_large_edge_is_capped(processor):
+    assert _stake(processor, win_rate=0.9, confidence=1.0) == processor.MAX_STAKE
+
+
+def test_payoff_ratio_comes_from_settled_contracts(processor):
+    _track(processor, "win")
+    _track(processor, "loss")
+    processor.settle_signal("win", 2.0)
+    processor.settle_signal("loss", -1.0)
+
+    assert processor.active_signals == {}
+    # R = 2 turns a 40% win rate into an edge: k = 0.4 - 0.6 / 2 = 0.1
+    assert _stake(processor, win_rate=0.4, confidence=0.6) == 1.5
+
+
+def test_settling_an_unknown_contract_is_ignored(processor):
+    processor.settle_signal("unknown", 5.0)
+
+    assert (processor._avg_win, processor._avg_loss) == (0.0, 0.0)
+
+
+def test_signal_without_edge_is_rejected_before_execution(processor):
+    signal = {"symbol": "R_100", "action": "buy", "price": 1.0, "win_rate": 0.5}
+
+    result = asyncio.run(processor.process_signal(signal, "TradingView"))
+
+    assert result["status"] == "rejected"
+    assert processor._today_count == 0
+
+
+class ContractInfoTrader:
+    """Answers get_contract_info from a dict, like DerivTrader's proposal_open_contract reply"""
+
+    def __init__(self, contracts):
+        self.contracts = contracts
+        self.awaiting_reply = False
+
+    async def get_contract_info(self, contract_id):
+        return self.contracts.get(contract_id)
+
+
+def test_finished_signal_contracts_are_settled_from_deriv(processor):
+    for contract_id in ("won", "lost", "open"):
+        _track(processor, contract_id)
+    trader = ContractInfoTrader({
+        "won": {"status": "won", "profit": 2.0},
+        "lost": {"status": "lost", "profit": -1.0},
+        "open": {"status": "open", "profit": 0.4},
+    })
+
+    settled = asyncio.run(processor.settle_open_signals(trader))
+
+    assert settled == 2
+    assert list(processor.active_signals) == ["open"]
+    assert _stake(processor, win_rate=0.4, confidence=0.6) == 1.5
+
+
+def _passes_risk_limits(processor, symbol="R_100"):
+    return asyncio.run(processor._check_risk_limits({"symbol": symbol}))
+
+
+def test_symbol_exposure_counts_open_signals_only(processor):
+    for contract_id in ("a", "b", "c"):
+        _track(processor, contract_id)
+    assert not _passes_risk_limits(processor)
+    assert _passes_risk_limits(processor, "R_50")
+
+    processor.settle_signal("a", 1.0)
+
+    assert _passes_risk_limits(processor)
+
+
+def test_new_day_resets_the_trade_count_but_not_open_exposure(processor):
+    for contract_id in ("a", "b", "c"):
+        _track(processor, contract_id)
+
+    processor._roll_day(processor._today + timedelta(days=1))
+
+    assert processor._today_count == 0
+    assert not _passes_risk_limits(processor)
@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+import main_new
+from models.database import SessionLocal, Tick
+
+
+@pytest.fixture
+def trade_manager():
+    manager = main_new.TradeManager()
+    with SessionLocal() as db:
+        db.query(Tick).delete()
+        db.commit()
+    yield manager
+    manager.tick_buffer.clear()
+
+
+def _tick_rows():
+    with SessionLocal() as db:
+        return db.query(Tick.price, Tick.last_digit).order_by(Tick.id).all()
+
+
+def test_buffered_ticks_are_all_written_on_flush(trade_manager):
+    prices = [1000.0 + i / 100 for i in range(25)]
+    for price in prices:
+        trade_manager.buffer_tick(price, int(round(price * 100)) % 10)
+
+    assert _tick_rows() == []
+
+    trade_manager.flush_ticks()
+
+    rows = _tick_rows()
+    assert len(rows) == len(prices)
+    assert [row.price for row in rows] == prices
+    assert [row.last_digit for row in rows] == [int(round(p * 100)) % 10 for p in prices]
+    assert trade_manager.tick_buffer == []
+
+
+def test_flush_is_due_once_the_batch_is_full(trade_manager):
+    trade_manager.last_tick_flush = float("inf")  # rule out the time trigger
+    due = [trade_manager.buffer_tick(1.0, 0) for _ in range(trade_manager.TICK_FLUSH_SIZE)]
+
+    assert not any(due[:-1])
+    assert due[-1]
+
+
+def test_flush_with_empty_buffer_writes_nothing(trade_manager):
+    trade_manager.flush_ticks()
+
+    assert _tick_rows() == []
+
+
+def test_periodic_flush_writes_a_stalled_buffer(trade_manager, monkeypatch):
+    monkeypatch.setattr(main_new.TradeManager, "TICK_FLUSH_INTERVAL", 0.02)
+    trade_manager.buffer_tick(1234.56, 6)
+
+    async def run_flusher():
+        flusher = asyncio.create_task(trade_manager.flush_ticks_periodically())
+        await asyncio.sleep(0.1)
+        flusher.cancel()
+
+    asyncio.run(run_flusher())
+
+    assert _tick_rows() == [(1234.56, 6)]
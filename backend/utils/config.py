@@ -24,6 +24,7 @@ class Config:
     DERIV_WS_URL = os.getenv('DERIV_WS_URL', 'wss://ws.binaryws.com/websockets/v3')
     DERIV_DEMO_APP_ID = '1089'
     DERIV_LIVE_APP_ID = '1089'
+    DERIV_MAX_CONCURRENT = int(os.getenv('DERIV_MAX_CONCURRENT', '8'))
 
     # Trading
     TRADING_MODE = os.getenv('TRADING_MODE', 'demo')
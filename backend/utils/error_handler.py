@@ -1,4 +1,5 @@
 import asyncio
+import time
 import traceback
 import sys
 from typing import Dict, Any, Optional
@@ -49,7 +50,7 @@ class ErrorHandler:
                 "type": error_type,
                 "message": str(exc),
                 "error_id": error_id,
-                "timestamp": asyncio.get_event_loop().time()
+                "timestamp": time.monotonic()
             }
         }
 
@@ -159,7 +160,7 @@ class CircuitBreaker:
         if self.last_failure_time is None:
             return True
 
-        elapsed = asyncio.get_event_loop().time() - self.last_failure_time
+        elapsed = time.monotonic() - self.last_failure_time
         return elapsed >= self.recovery_timeout
 
     def _on_success(self):
@@ -172,7 +173,7 @@ class CircuitBreaker:
     def _on_failure(self):
         """Handle failed call"""
         self.failure_count += 1
-        self.last_failure_time = asyncio.get_event_loop().time()
+        self.last_failure_time = time.monotonic()
 
         if self.failure_count >= self.failure_threshold:
             self.state = 'open'
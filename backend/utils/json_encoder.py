@@ -1,6 +1,6 @@
 import json
 import numpy as np
-import numpy
+import orjson
 from datetime import datetime
 
 class NumpyEncoder(json.JSONEncoder):
@@ -28,24 +28,22 @@ class NumpyEncoder(json.JSONEncoder):
         # Let the base class default method raise the TypeError
         return super().default(obj)
 
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def _orjson_default(obj):
+    """Fallback for what orjson can't serialize natively, mirroring NumpyEncoder"""
+    if isinstance(obj, bytes):
+        return obj.decode('utf-8')
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
 def json_dumps(data, **kwargs):
-    """Wrapper for json.dumps that uses NumpyEncoder by default"""
-    if 'cls' not in kwargs:
-        kwargs['cls'] = NumpyEncoder
-    return json.dumps(data, **kwargs)
-
-def convert_numpy_types(obj):
-    """Recursively convert numpy types in a dictionary or list to native Python types."""
-    if isinstance(obj, dict):
-        return {k: convert_numpy_types(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_numpy_types(i) for i in obj]
-    elif isinstance(obj, (numpy.int64, numpy.int32, np.integer)):
-        return int(obj)
-    elif isinstance(obj, (numpy.float64, numpy.float32, np.floating)):
-        return float(obj)
-    elif isinstance(obj, (numpy.ndarray, np.ndarray)):
-        return obj.tolist()
-    elif isinstance(obj, (np.bool_,)):
-        return bool(obj)
-    return obj
+    """Serialize to a JSON string; numpy values and datetimes are handled without a conversion pass.
+
+    orjson does the work unless json.dumps options are passed, in which case NumpyEncoder is used.
+    """
+    if kwargs:
+        kwargs.setdefault('cls', NumpyEncoder)
+        return json.dumps(data, **kwargs)
+    return orjson.dumps(data, default=_orjson_default, option=_ORJSON_OPTIONS).decode()
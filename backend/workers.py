@@ -0,0 +1,10 @@
+from uvicorn.workers import UvicornWorker
+
+
+class NoDeflateUvicornWorker(UvicornWorker):
+    """Uvicorn worker with WebSocket permessage-deflate turned off.
+
+    Broadcast frames are identical for every client, so per-connection zlib contexts
+    only cost memory and CPU recompressing the same bytes.
+    """
+    CONFIG_KWARGS = {**UvicornWorker.CONFIG_KWARGS, "ws_per_message_deflate": False}